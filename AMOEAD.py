@@ -1,209 +1,461 @@
 #################################
 # import functions and packages #
 #################################
-import os
 import argparse
 import yaml
 import random
 import numpy as np
-from scipy.special import comb
+from concurrent.futures import wait, FIRST_COMPLETED
 
 from Factory import set_problem
-from WeightVector import get_weights, determine_neighbor
+from WeightVector import weights_and_neighbors, neighbors
 from Population import init_pop, eval_pop
 from ReferencePoint import init_ref_point, update_ref_point
-from Mutation import perform_mutation, lf_mutation, poly_mutation, fix_bound, de_mutation
-from Decomposition import agg_value, tchebycheff
+from Mutation import perform_mutation, MutationEngine, mutation_pipeline
 from PriorityFunctions import priority_values
 from AdaptiveStrategy import evolve
 from AdaptiveWeightAdjustment import weight_adjustment, update_EP, init_EP
-from SelectMethods import select_solutions
-from UpdateMethods import update
-
-###################
-# parse arguments #
-###################
-parser = argparse.ArgumentParser()                                              # read arguments
-parser.add_argument('params', type=argparse.FileType('r'))                      # read arguments
-parser.add_argument('seed', type=int)                                           # read arguments
-args = parser.parse_args()                                                      # read arguments
-params = yaml.safe_load(args.params)                                            # read config file
-
-#######################
-# define output files #
-#######################
-save_data = params['save_data']
-if save_data == 'True':
-    output = params['output']                                                       # set output of record in this run
-    os.makedirs(f'./{output}', exist_ok=True)                                       # create a folder to include running results
-    os.makedirs(f'./{output}/history/', exist_ok=True)                              # create a folder to include running results
-    prefix = params['prob_name']
-    os.makedirs(f'./{output}/history/{prefix}_{args.seed}', exist_ok=True)       # create a folder to include running results
-    os.makedirs(f'./{output}/final/', exist_ok=True)                                # create a folder to include final results
-
-
-#########################
-# set MOEA/D parameters #
-#########################
-random.seed(args.seed)                                                          # set the seed for reproducibility purposes
-np.random.seed(args.seed)                                                       # set the seed for reproducibility purposes
-
-n_obj = params['n_obj']                                                         # set number of objectives
-n_var = params['n_var']                                                         # set number of variables
-xl = params['xl']                                                               # set boundary of variables
-xu = params['xu']                                                               # set boundary of variables
-
-decomp_method = params['decomp_method']                                            # set decomp method
-
-agg_function = params['agg_function']                                            # set scalar aggregation fuction method
-
-update_name = params['update']                                            # set update method 
-if update_name == "standard":
-    nr = INF
-
-n_eval = params['n_eval']                                                       # set maximum number of evaluation
-
-T = params['T']                                                                 # set neighbor size
-
-mutation_list = params['mutation_list']
-
-#######################
-# set MOP for solving #
-#######################
-prob_name = params['prob_name']                                                 # set optimization problem
-problem = set_problem(prob_name, n_var, n_obj, xu, xl)                          # set optimization problem
-
-###############################
-# define MOEA/D configuration #
-###############################
-W = get_weights(decomp_method, params)
-
-n_pop = len(W)
-
-params['n_pop'] = n_pop
-
-B = determine_neighbor(W, T)                                                    # determine neighbor
-
-X = init_pop(n_pop, n_var, xl, xu)                                              # initialize a population
-
-Y = eval_pop(X, problem, prob_name)                                                    # evaluate fitness
-
-ref_point = init_ref_point(Y)                                                           # determine a reference point
-EP = init_EP(X, Y, n_pop, n_obj)                                                #initialize External population
-
-beta = 0.3
-P = np.zeros(n_pop) + beta                                                      # generate a set of stability beta parameters 
-# P = np.random.uniform(params['betal'],params['betau'], n_pop)                                      # generate a set of stability parameters
-nr = params['nr']
-
-delta = params['delta']
-
-##################################
-# set self adaptive parameters #
-##################################
-betal = params['betal']                                                         # set lower bound for stability parameter of levy flight mutation
-betau = params['betau']                                                         # set upper bound 
-
-
-alpha_for_param = params['alpha for param']                                     # set scaling factor of levy flight to search parameters
-beta_for_param = params['beta for param']                                       # set stability factor of levy flight to search parameters
-n_step = params['n_step']                                                       # set number of generations to assess a parameter
-P_parent = P[:]                                                                 # initialize a list to store parameters in parent generations
-P_offspring = np.full(n_pop, np.nan)                                            # initialize a list to store parameters in offspring generations
-I = np.zeros(n_pop)                                                             # initialize a set of indicator vaules
-I_parent = I[:]                                                                 # initialize a list to store indicators in parent generations
-I_offspring = I[:]                                                              # initialize a list to store indicators in offspring generations
-
-###########################
-# set resource allocation #
-###########################
-priority_function = params['priority_function']                                 # name of the priority function for resource allocation
-ps_value = params['ps_value']                                                   # set index parameter of priority functions for resource allocation
-priority_values = priority_values(n_pop, priority_function, ps_value)           # generate an array of values for resource allocation based on priority_function named function
-
-
-perform_awa = params['perform_awa']                                            
-perform_SA = params['perform_SA']                                            
-################
-# start MOEA/D #
-################
-c_gen = 1                                                                       # control number of generations for output
-n_fe = n_pop
-
-while n_fe < n_eval:                                                            # main control loop, how swill the MOEA/D do
-
-    if save_data == 'True':
-        result = np.hstack([Y, X])                                                  # record objective values (Y) and decision variables (X)
-        np.savetxt(f'./{output}/history/{prob_name}_{args.seed}/{c_gen}_paretos.csv', result)   # record information (Y, X) about the current generation
-
-        info_gen = np.hstack([n_fe, c_gen])                                         # record number of function evaluations and current generation
-        np.savetxt(f'./{output}/history/{prob_name}_{args.seed}/{c_gen}_info_gen.csv', info_gen)# record information (n_fe and c_gen) about the current generation
-
-    for i in np.random.permutation(n_pop):                                      # traverse the population; randomly permuting solutions in the population set
-        if priority_values[i] >= np.random.uniform():                         # Priority values decide if a solution is candidate for change at an iteration. 
-            
-            n_fe += 1
-            xi_, fi = X[i, :], Y[i, :]                                   # get current individual and its fitness value
-
-            if random.random() < delta:                                 # determine selection pool by probability
-                pool = B[i, :]                                          # neighbor as the pool
+from UpdateMethods import replace_neighbors
+from Decomposition import aggregation
+from Output import make_output_dirs, open_history, save_final
+from Snapshot import SnapshotPolicy, run_with_snapshots
+from Indicators import IndicatorRecorder
+from EvaluatorPool import EvaluatorPool, evaluation_executor
+from EvaluationCache import EvaluationCache
+from Profiling import PhaseProfiler
+from Checkpoint import Checkpointer, checkpoint_path, load_checkpoint, restore_checkpoint
+
+
+class AMOEAD:
+    """
+    MOEA/D with priority functions, parameter self-adaptation and adaptive weight adjustment
+
+    The whole state of the optimizer lives in the attributes of the object
+    (X, Y, W, B, EP, ref_point, P, I, n_fe, c_gen, ...), so a run can be
+    built from a params dict, advanced one generation at a time with step()
+    or until a budget with run(), and inspected in between. With
+    n_evaluators > 0 in params, X and Y live in shared memory and the initial
+    population and batched generations are evaluated by an EvaluatorPool;
+    close() stops its processes.
+
+    parameter
+    ----------
+    params: dict
+      configuration of the run, as read from the YAML files in exp_scripts_*
+    seed: int
+      seed of `random` and `np.random`; None keeps the current RNG states
+    W, X, Y: 2D-Array
+      optional weight vectors, initial population and its fitness values,
+      used instead of generating them (e.g. for an island of a larger run)
+    """
+
+    def __init__(self, params, seed=None, W=None, X=None, Y=None):
+        params = dict(params)
+        self.params = params
+
+        #########################
+        # set MOEA/D parameters #
+        #########################
+        if seed is not None:
+            random.seed(seed)                                                   # set the seed for reproducibility purposes
+            np.random.seed(seed)                                                # set the seed for reproducibility purposes
+        self.seed = seed
+
+        self.n_obj = params['n_obj']                                            # set number of objectives
+        self.n_var = params['n_var']                                            # set number of variables
+        self.xl = params['xl']                                                  # set boundary of variables
+        self.xu = params['xu']                                                  # set boundary of variables
+
+        self.decomp_method = params['decomp_method']                            # set decomp method
+        self.agg_function = params['agg_function']                              # set scalar aggregation fuction method
+        self.aggregate = aggregation(self.agg_function, params)                 # the function itself, resolved once
+        self.update_name = params['update']                                     # set update method
+        self.n_eval = params['n_eval']                                          # set maximum number of evaluation
+        self.T = params['T']                                                    # set neighbor size
+        self.mutation_list = params['mutation_list']
+
+        #######################
+        # set MOP for solving #
+        #######################
+        self.prob_name = params['prob_name']                                    # set optimization problem
+        self.problem = set_problem(self.prob_name, self.n_var, self.n_obj, self.xu, self.xl)
+
+        ###############################
+        # define MOEA/D configuration #
+        ###############################
+        if W is None:
+            self.W, self.B = weights_and_neighbors(self.decomp_method, params, self.T)   # weight vectors and their neighbors
+        else:
+            self.W = np.array(W, dtype=float)
+            self.B = neighbors(self.W, self.T, params)                          # determine neighbor
+        self.n_pop = len(self.W)
+        params['n_pop'] = self.n_pop
+
+        self.n_evaluators = int(params.get('n_evaluators', 0))                  # evaluator processes for populations and batched generations
+        self.pool = EvaluatorPool(params, self.n_pop, self.n_evaluators) if self.n_evaluators > 0 else None
+        self.cache = None
+        if params.get('eval_cache', 'False') == 'True':                        # answer repeated decision vectors from a cache
+            self.cache = EvaluationCache(self.problem, self.prob_name, params.get('eval_cache_size', 10000),
+                                         params.get('eval_cache_quantum', 0.0), self.pool)
+            self.problem = self.cache
+        self.cache_hits_count = params.get('eval_cache_counts', 'True')         # whether cache hits count toward n_fe
+        self.max_hits = params.get('eval_cache_max_hits', self.n_eval)          # budget of the hits not counted in n_fe
+
+        self.X = init_pop(self.n_pop, self.n_var, self.xl, self.xu) if X is None else np.array(X, dtype=float)   # initialize a population
+        self.Y = np.zeros((self.n_pop, self.n_obj)) if Y is None else np.array(Y, dtype=float)
+        self.share_population()
+        if Y is None and self.cache is not None:
+            self.Y[:] = self.cache(self.X)                                      # evaluate fitness (and fill the cache)
+        elif Y is None:
+            self.Y[:] = eval_pop(self.X, self.problem, self.prob_name, self.pool)   # evaluate fitness
+
+        self.ref_point = init_ref_point(self.Y)                                 # determine a reference point
+        self.EP = init_EP(self.X, self.Y, self.n_pop, self.n_obj)               # initialize External population
+
+        beta = 0.3
+        self.P = np.zeros(self.n_pop) + beta                                    # generate a set of stability beta parameters
+        self.nr = params['nr']
+        self.delta = params['delta']
+
+        ##################################
+        # set self adaptive parameters #
+        ##################################
+        self.betal = params['betal']                                            # set lower bound for stability parameter of levy flight mutation
+        self.betau = params['betau']                                            # set upper bound
+        self.alpha_for_param = params['alpha for param']                        # set scaling factor of levy flight to search parameters
+        self.beta_for_param = params['beta for param']                          # set stability factor of levy flight to search parameters
+        self.n_step = params['n_step']                                          # set number of generations to assess a parameter
+        self.P_parent = self.P[:]                                               # initialize a list to store parameters in parent generations
+        self.P_offspring = np.full(self.n_pop, np.nan)                          # initialize a list to store parameters in offspring generations
+        self.I = np.zeros(self.n_pop)                                           # initialize a set of indicator vaules
+        self.I_parent = self.I[:]                                               # initialize a list to store indicators in parent generations
+        self.I_offspring = self.I[:]                                            # initialize a list to store indicators in offspring generations
+
+        ###########################
+        # set resource allocation #
+        ###########################
+        self.priority_function = params['priority_function']                   # name of the priority function for resource allocation
+        self.ps_value = params['ps_value']                                      # set index parameter of priority functions for resource allocation
+        self.priority_values = priority_values(self.n_pop, self.priority_function, self.ps_value)
+
+        self.perform_awa = params['perform_awa']
+        self.perform_SA = params['perform_SA']
+        self.batch_generation = params.get('batch_generation', 'False')         # evaluate the offspring of a generation in one call instead of one by one
+        self.mutation_engine = None
+        self.operators = None
+        if params.get('vectorized_mutation', 'False') == 'True' and self.batch_generation != 'True':
+            raise ValueError("vectorized_mutation: 'True' needs batch_generation: 'True'")
+        if params.get('mutation_engine', 'False') == 'True' or params.get('vectorized_mutation', 'False') == 'True':
+            self.rng = np.random.default_rng(np.random.randint(2**32))         # generator of the mutations, seeded from the run
+        if params.get('mutation_engine', 'False') == 'True':                   # draw the random numbers of the mutations in blocks
+            self.mutation_engine = MutationEngine(self.n_var, self.rng, self.n_pop)
+        if params.get('vectorized_mutation', 'False') == 'True':
+            self.operators = mutation_pipeline(self.mutation_list)              # matrix operators, resolved once
+        self.async_evaluations = int(params.get('async_evaluations', 0))        # steady state with up to this many offspring evaluated concurrently
+        self.executor = None
+        if self.async_evaluations > 0 and self.batch_generation != 'True':
+            problem = self.problem if self.cache is None else self.cache.problem  # the cache is looked up before submitting
+            self.executor, self.evaluate_async = evaluation_executor(params, problem, params.get('async_executor', 'thread'),
+                                                                     self.async_evaluations)
+
+        self.c_gen = 1                                                          # control number of generations for output
+        self.n_fe = self.n_pop
+        self.n_hits = 0                                                         # cache hits not counted in n_fe
+        self.on_evaluation = None                                               # optional hook called with the optimizer after each applied offspring
+
+    def run(self, n_eval=None, callback=None):
+        """
+        Run generations until n_eval function evaluations are reached
+
+        With eval_cache_counts: 'False' the cache hits do not count in n_fe,
+        so a converged population could be answered by the cache forever;
+        the run also stops when these hits reach eval_cache_max_hits.
+
+        parameter
+        ----------
+        n_eval: int
+          evaluation budget; defaults to n_eval of the params
+        callback: method
+          called with the optimizer at the start of every generation
+
+        return
+        ----------
+        AMOEAD
+          the optimizer itself
+        """
+        n_eval = self.n_eval if n_eval is None else n_eval
+        while self.n_fe < n_eval and self.n_hits < self.max_hits:               # main control loop, how swill the MOEA/D do
+            if callback is not None:
+                callback(self)
+            self.step()
+        return self
+
+    def step(self):
+        """
+        Run one generation: offspring creation and replacement, then AWA and SA
+        """
+        if self.executor is not None:                                           # asynchronous steady state: apply each offspring as soon as its evaluation returns
+            pending = {}                                                        # future -> (submission order, offspring, selection pool)
+            for o, i in enumerate(np.random.permutation(self.n_pop)):
+                if self.priority_values[i] >= np.random.uniform():
+                    if len(pending) >= self.async_evaluations:                  # wait for a free slot only to submit an offspring
+                        self.apply_completed(pending)
+                    xi_, pool = self.create_offspring(i)
+                    fi_ = None if self.cache is None else self.cache.lookup(xi_)
+                    if fi_ is not None:                                         # answered by the cache, nothing to wait for
+                        self.finish_offspring(xi_, fi_, pool, hit=True)
+                    else:
+                        pending[self.executor.submit(self.evaluate_async, xi_)] = (o, xi_, pool)
+            while pending:                                                      # the generation ends when all its offspring are applied
+                self.apply_completed(pending)
+
+        elif self.batch_generation != 'True':                                   # steady state: evaluate and apply each offspring as soon as it is created
+            for i in np.random.permutation(self.n_pop):                         # traverse the population; randomly permuting solutions in the population set
+                if self.priority_values[i] >= np.random.uniform():              # Priority values decide if a solution is candidate for change at an iteration.
+                    xi_, pool = self.create_offspring(i)
+                    fi_ = self.problem(xi_)                                     # evaluate offspring (new solution)
+                    self.finish_offspring(xi_, fi_, pool, hit=self.cache is not None and self.cache.last_hits > 0)
+
+        else:                                                                   # batched generation: build, evaluate and apply all offspring at once
+            order = np.random.permutation(self.n_pop)
+            selected = order[self.priority_values[order] >= np.random.uniform(size=self.n_pop)]   # subproblems chosen by the priority values in this generation (same draws as one by one)
+            if self.pool is not None and self.cache is None:
+                X_off = self.pool['X_off'][:len(selected)]                      # offspring matrix of the generation, in shared memory
             else:
-                pool = np.arange(n_pop)                                 # population as the pool
-
-            j = int(np.random.choice(pool))                                  # select a random individual from pool
-            xj, fj = X[j, :], Y[j, :]
-
-
-            params['beta'] = P[i]                                       # self-adaptive beta parameters: set of beta parameters for each subproblem 
-            params['i'] = i                                      
-            for mutation in mutation_list:
-                xi_ = perform_mutation(mutation, xi_, xj, X, params)             # perform mutations
-            
-            fi_ = problem(xi_)                                              # evaluate offspring (new solution)
-            
-            if perform_awa == 'True':
-                EP = update_EP(EP, np.array([fi_,xi_]), n_pop, n_obj)               # update External population
-
-            ref_point = update_ref_point(ref_point, fi_)                                # update reference point
-
-            nc = 0                                                      # initialize the update counter
-            for k in np.random.permutation(len(pool)):                  # traverse the selection pool
-
-                fk = Y[k, :]                                            # get k-th individual fitness
-                wk = W[k, :]                                            # get k-th weight vector
-
-                value_i = agg_value(agg_function, fi_, wk, ref_point)              # compute scalar aggregation value cost of offspring
-                value_k = agg_value(agg_function, fk, wk, ref_point)               # compute scalar aggregation value cost of offspring
-
-                if value_i <= value_k:   # compare tchebycheff cost of offspring and parent
-
-                    X[k] = xi_                                          # update parent
-                    Y[k] = fi_
-                    nc += 1 
-
-                if nc >= nr: break                                      # break if counter arrive the upper limit
-
-    if perform_awa == 'True':
-        X, Y, W, B = weight_adjustment(c_gen, W, X, Y, B, EP, ref_point, params)
-
-    c_gen += 1                                                                   # end of current iteration (generation), add 1
-    
-    if perform_SA == 'True':
-        P, P_parent, P_offspring, I, I_parent, I_offspring = \
-            evolve(P, P_parent, P_offspring, I, I_parent, I_offspring,
-                   B, c_gen, n_step,
-                   betal, betau, alpha_for_param, beta_for_param)                   # evolve the stability parameters for adaption of levy flight parameters
-
-    
-################
-# End MOEA/D #
-################
-if save_data == 'True':
-    info_gen = np.hstack([n_fe, c_gen])                                      # record information (n_fe and c_gen) about the current generation
-    result = np.hstack([Y, X])                                          # record objective values and decision variables
-
-    np.savetxt(f'./{output}/history/{prob_name}_{args.seed}/{c_gen}_info_gen.csv', info_gen)
-    np.savetxt(f'./{output}/history/{prob_name}_{args.seed}/{c_gen}_paretos.csv', result)
-
-    np.savetxt(f'./{output}/final/{prob_name}_{args.seed}_paretos.csv', result)
-    np.savetxt(f'./{output}/final/{prob_name}_{args.seed}_info_gen.csv', info_gen)
\ No newline at end of file
+                X_off = np.empty((len(selected), self.n_var))                   # offspring matrix of the generation
+            if self.operators is not None:
+                pools = self.create_offspring_matrix(selected, X_off)
+            else:
+                pools = []                                                      # selection pool of each offspring
+                for o, i in enumerate(selected):
+                    X_off[o], pool = self.create_offspring(i)
+                    pools.append(pool)
+
+            if self.cache is not None:
+                Y_off = self.cache(X_off)                                       # evaluate the offspring not in the cache in a single call
+                hits = self.cache.last_hit_mask
+            else:
+                Y_off = eval_pop(X_off, self.problem, self.prob_name, self.pool)   # evaluate all offspring in a single call
+                hits = np.zeros(len(selected), dtype=bool)
+
+            for o in range(len(selected)):
+                self.finish_offspring(X_off[o], Y_off[o], pools[o], hit=hits[o])
+
+        self.adjust_weights()
+
+        self.c_gen += 1                                                         # end of current iteration (generation), add 1
+
+        self.adapt_parameters()
+
+    def adjust_weights(self):
+        """
+        Adaptive weight vector adjustment at the end of a generation
+        """
+        if self.perform_awa == 'True':
+            self.X, self.Y, self.W, self.B = weight_adjustment(self.c_gen, self.W, self.X, self.Y, self.B,
+                                                               self.EP, self.ref_point, self.params)
+            self.share_population()
+
+    def adapt_parameters(self):
+        """
+        Self-adaptation of the stability parameters at the end of a generation
+        """
+        if self.perform_SA == 'True':
+            self.P, self.P_parent, self.P_offspring, self.I, self.I_parent, self.I_offspring = \
+                evolve(self.P, self.P_parent, self.P_offspring, self.I, self.I_parent, self.I_offspring,
+                       self.B, self.c_gen, self.n_step,
+                       self.betal, self.betau, self.alpha_for_param, self.beta_for_param)   # evolve the stability parameters for adaption of levy flight parameters
+
+    def share_population(self):
+        """
+        Keep X and Y in the shared memory of the evaluator pool, if there is one
+        """
+        if self.pool is None:
+            return
+        for key in ('X', 'Y'):
+            shared = self.pool[key]
+            if getattr(self, key) is not shared:                                # e.g. new arrays built by the weight adjustment
+                shared[:] = getattr(self, key)
+                setattr(self, key, shared)
+
+    def close(self):
+        """
+        Stop the evaluator processes and threads, if any; X and Y are copied out of their shared memory first
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.pool is not None:
+            self.X, self.Y = self.X.copy(), self.Y.copy()
+            self.pool.close()
+            self.pool = None
+
+    def create_offspring(self, i):
+        """
+        Select a mating pool and a partner for subproblem i and mutate its solution
+
+        return
+        ----------
+        tuple
+          the offspring (1D-Array) and the selection pool used for the replacement
+        """
+        xi_ = self.X[i, :]                                                      # get current individual
+
+        if random.random() < self.delta:                                        # determine selection pool by probability
+            pool = self.B[i, :]                                                 # neighbor as the pool
+        else:
+            pool = np.arange(self.n_pop)                                        # population as the pool
+
+        j = int(np.random.choice(pool))                                         # select a random individual from pool
+        xj = self.X[j, :]
+
+        self.params['beta'] = self.P[i]                                         # self-adaptive beta parameters: set of beta parameters for each subproblem
+        self.params['i'] = i
+        return self.mutate(xi_, xj), pool
+
+    def mutate(self, xi_, xj):
+        """
+        Apply the mutations of mutation_list to xi_, with partner xj and the beta and i set in params
+        """
+        for mutation in self.mutation_list:
+            if self.mutation_engine is not None:
+                xi_ = self.mutation_engine.mutate(mutation, xi_, xj, self.X, self.params)
+            else:
+                xi_ = perform_mutation(mutation, xi_, xj, self.X, self.params)  # perform mutations
+        return xi_
+
+    def create_offspring_matrix(self, selected, X_off):
+        """
+        Create the offspring of all selected subproblems in X_off with the matrix operators of the mutation pipeline
+
+        return
+        ----------
+        list
+          the selection pool of each offspring, for the replacement
+        """
+        k = len(selected)
+        neighbors = self.rng.random(k) < self.delta                             # neighbors or whole population as the pool
+        J = np.where(neighbors,
+                     self.B[selected, self.rng.integers(0, self.B.shape[1], k)],
+                     self.rng.integers(0, self.n_pop, k))                       # a random individual from the pool of each offspring
+        X_off[:] = self.X[selected]
+        for operator in self.operators:
+            X_off[:] = operator(X_off, self.X, selected, J, self.P[selected], self.params, self.rng)
+
+        population = np.arange(self.n_pop)
+        return [self.B[i, :] if neighbor else population for i, neighbor in zip(selected, neighbors)]
+
+    def apply_completed(self, pending):
+        """
+        Wait for at least one of the pending evaluations and apply the completed ones, in submission order
+        """
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in sorted(done, key=lambda f: pending[f][0]):
+            _, xi_, pool = pending.pop(future)
+            fi_ = future.result()
+            if self.cache is not None:
+                self.cache.store(xi_, fi_)
+            self.finish_offspring(xi_, fi_, pool, hit=False)
+
+    def finish_offspring(self, xi_, fi_, pool, hit):
+        """
+        Count an evaluated offspring in n_fe (a cache hit only if eval_cache_counts is 'True', else in n_hits), apply it and call the hook
+        """
+        if not hit or self.cache_hits_count == 'True':
+            self.n_fe += 1
+        else:
+            self.n_hits += 1
+        self.apply_offspring(xi_, fi_, pool)
+        if self.on_evaluation is not None:
+            self.on_evaluation(self)
+
+    def apply_offspring(self, xi_, fi_, pool):
+        """
+        Update EP, the reference point and the selection pool with an evaluated offspring
+
+        return
+        ----------
+        1D-Array
+          indices of the replaced solutions
+        """
+        if self.perform_awa == 'True':
+            self.EP = update_EP(self.EP, (fi_, xi_), self.n_pop, self.n_obj)    # update External population
+
+        self.ref_point = update_ref_point(self.ref_point, fi_)                  # update reference point
+
+        return replace_neighbors(self.aggregate, xi_, fi_, np.random.permutation(len(pool)),
+                                 self.X, self.Y, self.W, self.ref_point, self.nr)   # replace at most nr solutions of the selection pool
+
+
+def main(argv=None):
+    ###################
+    # parse arguments #
+    ###################
+    parser = argparse.ArgumentParser()                                          # read arguments
+    parser.add_argument('params', type=argparse.FileType('r'))                  # read arguments
+    parser.add_argument('seed', type=int)                                       # read arguments
+    parser.add_argument('--resume', nargs='?', const='', metavar='CHECKPOINT',
+                        help='continue from a checkpoint (default: the checkpoint file of the run)')
+    args = parser.parse_args(argv)                                              # read arguments
+    params = yaml.safe_load(args.params)                                        # read config file
+    args.params.close()
+
+    checkpoint = None
+    checkpointing = int(params.get('checkpoint_every', 0)) > 0 or float(params.get('checkpoint_seconds', 0)) > 0
+    if args.resume is not None:                                                 # rebuild the optimizer from W, X, Y without evaluating
+        arrays, meta = load_checkpoint(args.resume or checkpoint_path(params, args.seed))
+        moead = AMOEAD(params, None, W=arrays['W'], X=arrays['X'], Y=arrays['Y'])
+    else:
+        moead = AMOEAD(params, args.seed)
+
+    save_data = params['save_data'] == 'True'
+    output = params.get('output')                                               # set output of record in this run
+    policies = []
+    history = None
+
+    #######################
+    # define output files #
+    #######################
+    if save_data:
+        folder = make_output_dirs(output, moead.prob_name, args.seed)
+        history = open_history(params, folder, moead.n_obj, moead.n_var,
+                               meta['history_offset'] if args.resume is not None else None, checkpointing)
+        policies.append(SnapshotPolicy(params, history))
+
+    if params.get('indicators', 'False') == 'True':                            # track HV and IGD in-process
+        path = f'./{output}/final/{moead.prob_name}_{args.seed}_indicators.csv' if save_data else None
+        moead.indicators = IndicatorRecorder(params, moead.n_obj, moead.n_var, path)
+        policies.append(SnapshotPolicy(params, moead.indicators, prefix='indicator'))
+
+    if args.resume is not None:
+        restore_checkpoint(moead, arrays, meta, policies)
+    if checkpointing:
+        checkpoint = Checkpointer(checkpoint_path(params, args.seed), params.get('checkpoint_every', 0),
+                                  params.get('checkpoint_seconds', 0), policies, history)
+
+    profiler = None
+    if params.get('profile', 'False') == 'True':                               # time the phases of every generation
+        extension = 'json' if params.get('profile_format', 'csv') == 'json' else 'csv'
+        path = f'./{output}/final/{moead.prob_name}_{args.seed}_profile.{extension}' if save_data else None
+        profiler = PhaseProfiler(moead, path)
+
+    try:
+        run_with_snapshots(moead, policies, checkpoint)
+    finally:
+        moead.close()
+        if profiler is not None:
+            profiler.close()
+
+    if profiler is not None:
+        print(profiler.summary())
+
+    if moead.cache is not None:
+        print(f'evaluation cache: {moead.cache.hits} hits, {moead.cache.misses} misses')
+
+    if save_data:
+        save_final(output, moead.prob_name, args.seed, moead.Y, moead.X, moead.n_fe, moead.c_gen)
+    return moead
+
+
+if __name__ == '__main__':
+    main()
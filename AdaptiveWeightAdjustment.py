@@ -1,6 +1,8 @@
 import numpy as np
 from sklearn.neighbors import NearestNeighbors
-from WeightVector import determine_neighbor
+from WeightVector import neighbors, update_neighbors, patch_neighbors
+from ExternalPopulation import ExternalPopulation
+from SparsityTruncation import removal_order
 
 
 def weight_adjustment(c_gen, W, X, Y, B, EP, ref_point, params):
@@ -16,16 +18,27 @@ def weight_adjustment(c_gen, W, X, Y, B, EP, ref_point, params):
     G_max = int((n_eval/len(W))/ps_value)                                            # approximated max generation
 
     if c_gen>=rate_evol*G_max and c_gen % wag == 0:                             # If satisfy this fomula, start AWA      
+        EP.truncate()                                                           # bring EP back to its size limit before using it
         nus = int(min(len(EP),rate_update_weight*len(Y)))                       # number of update subproblem
-        X, Y, W = delete_vector(X, Y, W, n_obj, nus)                            # delete vector
-        X, Y, W = add_vector(EP, X, Y, W, ref_point, nus)                       # dd vector
-        B = determine_neighbor(W, T)                                            # re-compute neighbor
+        if nus > 0 and B is not None and params.get('awa_layout', 'shift') == 'slots':
+            removed = removal_order(Y, n_obj, nus)                              # same vectors as delete_vector
+            X, Y, W = refill_vector(EP, X, Y, W, removed, ref_point)            # new vectors in the freed slots
+            B = patch_neighbors(W, B, removed, T, params)                       # re-compute the neighbors that may have changed
+        elif nus > 0:                                                           # small populations (e.g. an island) may have nothing to update
+            X, Y, W, removed = delete_vector(X, Y, W, n_obj, nus)               # delete vector
+            X, Y, W = add_vector(EP, X, Y, W, ref_point, nus)                   # dd vector
+            if B is None:
+                pass                                                            # the caller rebuilds the neighbors (e.g. an island, with its halo)
+            elif params.get('neighbor_method', 'argsort') == 'partition':
+                B = update_neighbors(W, B, removed, T)                          # re-compute the neighbors that may have changed
+            else:
+                B = neighbors(W, T, params)                                     # re-compute neighbor
         
     return (X, Y, W, B)
 
 def calc_SL(Y, pop, n_objs, Y_is_pop=True):
     num = min(n_objs,len(Y))
-    neigh = NearestNeighbors(num)
+    neigh = NearestNeighbors(n_neighbors=num)
     Y = [item for item in Y]
     pop = [item for item in pop]
     neigh.fit(Y)
@@ -37,55 +50,60 @@ def calc_SL(Y, pop, n_objs, Y_is_pop=True):
     return SL
 
 def update_EP(EP, solution, pop, n_obj):
-    add_flag = False
-    if len(EP)==0:
-        return np.array([solution])
-    remove_list = []
-    L = len(EP)
-    
-    for i in range(L):
-        flag = ParetoDominance(solution[0],EP[i][0])
-        if flag == 1:
-            return EP
-        elif flag == -1:
-            remove_list.append(EP[i])
-            add_flag = True
-        elif flag == 0:
-            add_flag = True
-            
-    if len(EP)==0:
-        add_flag = True
-
-    if add_flag:
-        EP = np.append(EP,[solution],axis=0)
-    for item in remove_list:
-        np.delete(EP,np.where(EP==item))
+    """
+    Update the External population with a solution given as (objective values, decision variables)
+    """
+    EP.add(solution[0], solution[1])
+    return EP
 
-    new_EP = kNN_EP(EP, n_obj, pop)
-    return new_EP
+def kNN_EP(F, n_objs, limit):
+    """
+    Greedily remove the most crowded point until at most limit points remain
 
-def kNN_EP(EP, n_objs, pop):
-    while(len(EP)>pop*1.5):
-        SL = calc_SL(EP[:, 0], EP[:, 0],n_objs)
-        EP = np.delete(EP,np.argmin(SL),0)
-    return EP.tolist()
+    return
+    ----------
+    1D-Array
+      indices of the remaining points, in their original order
+    """
+    removed = removal_order(F, n_objs, len(F) - limit)
+    return np.delete(np.arange(len(F)), removed)
 
 def delete_vector(X, Y, W, n_objs, nus):
-    for i in range(nus):
-        SL = calc_SL(Y, Y, n_objs)
-        X = np.delete(X,np.argmin(SL),0)
-        Y = np.delete(Y,np.argmin(SL),0)
-        W = np.delete(W,np.argmin(SL),0)
-    return X,Y,W
+    removed = removal_order(Y, n_objs, nus)                                     # as removing the argmin of calc_SL one by one, up to ties
+    X = np.delete(X,removed,0)
+    Y = np.delete(Y,removed,0)
+    W = np.delete(W,removed,0)
+    return X,Y,W,removed
 
 def add_vector(EP, X, Y, W, ref_point, nus, epsilon = 10**-7):
+    ind_sp, FV_sp, Vec_sp = new_vectors(EP, Y, ref_point, nus, epsilon)
+    X = np.append(X,ind_sp,axis=0)
+    Y = np.append(Y,FV_sp,axis=0)
+    W = np.append(W,Vec_sp,axis=0)
+    return X,Y,W
+
+def refill_vector(EP, X, Y, W, removed, ref_point, epsilon = 10**-7):
+    """
+    Put the vectors add_vector would append into the slots of the removed ones, in place
+
+    The sparsity of the EP members is computed against the population
+    without the removed solutions, as after delete_vector. The indices of
+    the other subproblems do not change.
+    """
+    slots = np.sort(removed)
+    ind_sp, FV_sp, Vec_sp = new_vectors(EP, np.delete(Y, slots, 0), ref_point, len(slots), epsilon)
+    X[slots] = ind_sp
+    Y[slots] = FV_sp
+    W[slots] = Vec_sp
+    return X,Y,W
+
+def new_vectors(EP, Y, ref_point, nus, epsilon = 10**-7):
     Vec_sp = []
     FV_sp = []
     ind_sp = []
-    EP = np.array(EP)
-    objs = EP[:, 0]
-    individuals = EP[:, 1]
-    SL = calc_SL(Y, EP[:,0], len(ref_point), False)
+    objs = EP.objectives
+    individuals = EP.decisions
+    SL = calc_SL(Y, objs, len(ref_point), False)
     for count in range(nus):
         F_sp = objs[np.argmax(SL)]
         F_sp_ideal = sum([1/(F_sp[i] - ref_point[i]+epsilon) for i in range(len(ref_point))])
@@ -93,16 +111,12 @@ def add_vector(EP, X, Y, W, ref_point, nus, epsilon = 10**-7):
         FV_sp.append(F_sp)
         Vec_sp.append([(1/(F_sp[i] - ref_point[i]+epsilon))/F_sp_ideal for i in range(len(ref_point))])
         SL.remove(max(SL))
-
-    X = np.append(X,ind_sp,axis=0)
-    Y = np.append(Y,FV_sp,axis=0)
-    W = np.append(W,Vec_sp,axis=0)
-    return X,Y,W
+    return ind_sp, FV_sp, Vec_sp
 
 def init_EP(X, Y, n_pop, n_obj):
-    EP = np.array([])
+    EP = ExternalPopulation(n_obj, X.shape[1], int(n_pop*1.5))
     for i in range(n_pop):
-        EP = update_EP(EP,np.array([Y[i, :],X[i, :]]), n_pop, n_obj)
+        EP = update_EP(EP,(Y[i, :],X[i, :]), n_pop, n_obj)
     return EP
 
 def ParetoDominance(solution1,solution2):
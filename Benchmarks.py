@@ -0,0 +1,278 @@
+#################################
+# import functions and packages #
+#################################
+import sys
+import copy
+import json
+import random
+import argparse
+import platform
+import itertools
+from timeit import Timer
+from datetime import datetime
+from math import comb
+import numpy as np
+
+import MultiObjectiveProblem as MOOP
+from WeightVector import das_dennis, determine_neighbor
+from Decomposition import tchebycheff
+from AdaptiveWeightAdjustment import update_EP, init_EP, calc_SL
+from Mutation import lf_mutation, poly_mutation, de_mutation
+from AMOEAD import AMOEAD
+
+
+GRID = {'n_pop': [100, 500], 'n_var': [30], 'n_obj': [2, 3], 'T': [20]}     # default grid of the suite
+GENERATION_STEPS = 10                                                           # generations per measurement of the generation benchmark
+UF_OBJECTIVES = {f'UF{k}': 2 if k <= 7 else 3 for k in range(1, 11)}          # UF1-7 are bi-objective, UF8-10 tri-objective
+
+
+def n_partitions(n_pop, n_obj):
+    """
+    Smallest number of partitions for which das_dennis gives at least n_pop weight vectors
+    """
+    n_part = 1
+    while comb(n_part + n_obj - 1, n_obj - 1) < n_pop:
+        n_part += 1
+    return n_part
+
+
+def front(n, n_obj):
+    """
+    n random points of the positive part of the unit sphere, a mutually non-dominated set
+    """
+    Y = np.abs(np.random.normal(size=(n, n_obj)))
+    return Y / np.linalg.norm(Y, axis=1, keepdims=True)
+
+
+def generation_params(case):
+    """
+    Configuration of exp_scripts_adaptive for DTLZ2 with the sizes of the case
+    """
+    return {'prob_name': 'dtlz2', 'n_obj': case['n_obj'], 'n_var': case['n_var'], 'xl': 0, 'xu': 1,
+            'decomp_method': 'sld', 'sld_n_part': n_partitions(case['n_pop'], case['n_obj']),
+            'agg_function': 'wt', 'update': 'restricted', 'n_eval': 10**9, 'T': case['T'],
+            'delta': 0.9, 'nr': 2, 'mutation_list': ['de_mutation', 'polynomial_mutation'],
+            'alpha': 1.e-05, 'betal': 0.1, 'betau': 1.0, 'etam': 20, 'perform_SA': 'True',
+            'alpha for param': 0.1, 'beta for param': 1.0, 'n_step': 20,
+            'wag': 120, 'rate_evol': 0.3, 'rate_update_weight': 0.05,
+            'priority_function': 'partial_update', 'ps_value': 0.1,
+            'WS_transform': 'False', 'perform_awa': 'True', 'save_data': 'False'}
+
+
+#################################################################
+# benchmarks: each one builds its inputs for a case and returns #
+# the function to time, or None if it does not apply to the case #
+# (or a (function, setup) pair when the function changes its     #
+# inputs: setup restores them before every single call)          #
+#################################################################
+
+def bench_das_dennis(case):
+    n_part = n_partitions(case['n_pop'], case['n_obj'])
+    return lambda: das_dennis(n_part, case['n_obj'])
+
+def bench_determine_neighbor(case):
+    W = das_dennis(n_partitions(case['n_pop'], case['n_obj']), case['n_obj'])[:case['n_pop']]
+    return lambda: determine_neighbor(W, case['T'])
+
+def bench_tchebycheff(case):
+    y, w, z = np.random.random(case['n_obj']), np.random.random(case['n_obj']), np.zeros(case['n_obj'])
+    return lambda: tchebycheff(y, w, z)
+
+def bench_update_EP(case):
+    """
+    Fill a fresh EP of n_pop members with n_pop solutions of another front
+    """
+    n_pop, n_obj, n_var = case['n_pop'], case['n_obj'], case['n_var']
+    Y, Y_new = front(n_pop, n_obj), 0.999 * front(n_pop, n_obj)
+    X, X_new = np.random.random((n_pop, n_var)), np.random.random((n_pop, n_var))
+    EP = init_EP(X, Y, n_pop, n_obj)
+    size = len(EP)
+    F0, X0 = EP.objectives.copy(), EP.decisions.copy()
+
+    def run():
+        EP.size = size                                                          # back to the initial members
+        EP.F[:size], EP.X[:size] = F0, X0
+        for k in range(n_pop):
+            update_EP(EP, (Y_new[k], X_new[k]), n_pop, n_obj)
+    return run
+
+def bench_calc_SL(case):
+    Y = front(case['n_pop'], case['n_obj'])
+    return lambda: calc_SL(Y, Y, case['n_obj'])
+
+def bench_lf_mutation(case):
+    xi, xj = np.random.random(case['n_var']), np.random.random(case['n_var'])
+    return lambda: lf_mutation(xi, xj, 1.e-05, 0.3)
+
+def bench_poly_mutation(case):
+    x = np.random.random(case['n_var'])
+    return lambda: poly_mutation(x, 20, 0, 1)
+
+def bench_de_mutation(case):
+    X = np.random.random((case['n_pop'], case['n_var']))
+    return lambda: de_mutation(X[0], X, case['n_pop'], 0, 0.3)
+
+def bench_uf(name):
+    def bench(case):
+        if UF_OBJECTIVES[name] != case['n_obj']:
+            return None
+        X = np.random.random((case['n_pop'], case['n_var']))
+        problem = getattr(MOOP, f'{name}_pop')
+        return lambda: problem(X)
+    return bench
+
+def bench_generation(case):
+    """
+    GENERATION_STEPS generations (step) of AMOEAD with the adaptive configuration on DTLZ2
+
+    A step changes the optimizer (EP size, subproblems selected by the
+    priority values), so every call starts from a deep copy of the same
+    initial optimizer with the same random states, and does the same work.
+    n_eval is set so large that the weight adjustment is never triggered.
+    """
+    initial = AMOEAD(generation_params(case), seed=1)
+    states = random.getstate(), np.random.get_state()
+    current = []
+
+    def setup():
+        current[:] = [copy.deepcopy(initial)]
+        random.setstate(states[0])
+        np.random.set_state(states[1])
+
+    def run():
+        moead = current[0]
+        for _ in range(GENERATION_STEPS):
+            moead.step()
+    return run, setup
+
+
+BENCHMARKS = {'das_dennis': bench_das_dennis,
+              'determine_neighbor': bench_determine_neighbor,
+              'tchebycheff': bench_tchebycheff,
+              'update_EP': bench_update_EP,
+              'calc_SL': bench_calc_SL,
+              'lf_mutation': bench_lf_mutation,
+              'poly_mutation': bench_poly_mutation,
+              'de_mutation': bench_de_mutation,
+              **{name: bench_uf(name) for name in UF_OBJECTIVES},
+              'generation': bench_generation}
+
+
+def time_function(function, repeat=5, min_time=0.05, setup=None):
+    """
+    Time a function as timeit does: the number of calls per measurement is
+    chosen so that a measurement takes at least min_time seconds, and the
+    best of `repeat` measurements is kept
+
+    With a setup, every measurement is a single call after setup (untimed).
+
+    return
+    ----------
+    dict
+      best and median seconds per call, and the number of calls per measurement
+    """
+    if setup is not None:
+        timer = Timer(function, setup)
+        number = 1
+    else:
+        timer = Timer(function)
+        number = 1
+        while timer.timeit(number) < min_time:
+            number *= 2 if number < 1000 else 10
+    times = np.array(timer.repeat(repeat, number)) / number
+    return {'best': float(np.min(times)), 'median': float(np.median(times)), 'number': number}
+
+
+def case_key(name, case):
+    return name + ''.join(f' {key}={case[key]}' for key in sorted(case))
+
+
+def run_suite(names, grid, seed=1, repeat=5, min_time=0.05):
+    """
+    Time every benchmark in names on every case of the grid
+
+    The cases are the cartesian product of the values of grid; `random`
+    and `np.random` are seeded before each setup, so the inputs of a case
+    are the same in every run.
+
+    return
+    ----------
+    dict
+      the machine and settings of the run (meta) and one result per (benchmark, case)
+    """
+    results = {}
+    for name in names:
+        for values in itertools.product(*grid.values()):
+            case = dict(zip(grid, values))
+            random.seed(seed)
+            np.random.seed(seed)
+            function = BENCHMARKS[name](case)
+            if function is None:
+                continue
+            function, setup = function if isinstance(function, tuple) else (function, None)
+            key = case_key(name, case)
+            results[key] = {'name': name, 'case': case, **time_function(function, repeat, min_time, setup)}
+            print(f"{key:60s} {results[key]['best'] * 1e6:12.2f} us")
+    meta = {'date': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'machine': platform.machine(), 'processor': platform.processor(),
+            'seed': seed, 'repeat': repeat, 'min_time': min_time}
+    return {'meta': meta, 'results': results}
+
+
+def compare(current, baseline, tolerance):
+    """
+    Compare the best times of two runs of the suite
+
+    return
+    ----------
+    list
+      (key, baseline seconds, current seconds, ratio) of the results slower than baseline * (1 + tolerance)
+    """
+    slower = []
+    print(f"{'benchmark':60s} {'baseline':>15s} {'current':>15s} {'ratio':>8s}")
+    for key, result in current['results'].items():
+        if key not in baseline['results']:
+            continue
+        before, after = baseline['results'][key]['best'], result['best']
+        ratio = after / before
+        print(f'{key:60s} {before * 1e6:12.2f} us {after * 1e6:12.2f} us {ratio:7.2f}x')
+        if ratio > 1 + tolerance:
+            slower.append((key, before, after, ratio))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the building blocks of MOEA/D over a grid of sizes')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS), metavar='NAME',
+                        help=f'benchmarks to run (default: all of {", ".join(BENCHMARKS)})')
+    for key, values in GRID.items():
+        parser.add_argument(f'--{key}', type=int, nargs='+', default=values, help=f'values of {key} (default: {values})')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5, help='measurements per case; the best is kept (default: 5)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per measurement (default: 0.05)')
+    parser.add_argument('--output', help='JSON file to save the results in (e.g. a new baseline)')
+    parser.add_argument('--baseline', help='JSON file of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed slowdown against the baseline before failing (default: 0.1, i.e. 10%%)')
+    args = parser.parse_args(argv)
+
+    grid = {key: getattr(args, key) for key in GRID}
+    current = run_suite(args.only, grid, args.seed, args.repeat, args.min_time)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=1)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = compare(current, baseline, args.tolerance)
+        if slower:
+            print(f'{len(slower)} benchmarks slower than the baseline by more than {args.tolerance:.0%}:', file=sys.stderr)
+            for key, before, after, ratio in slower:
+                print(f'  {key}: {ratio:.2f}x', file=sys.stderr)
+            sys.exit(1)
+    return current
+
+
+if __name__ == '__main__':
+    main()
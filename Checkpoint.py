@@ -0,0 +1,224 @@
+import os
+import glob
+import json
+import time
+import random
+import numpy as np
+
+from ExternalPopulation import ExternalPopulation
+
+
+STATE_ARRAYS = ('X', 'Y', 'W', 'B', 'ref_point', 'P', 'P_parent', 'P_offspring',
+                'I', 'I_parent', 'I_offspring', 'priority_values')               # attributes of the optimizer saved as they are (those it has)
+ENGINE_BLOCKS = ('normal', 'uniform', 'poly', 'de')                            # RandomBlocks of a MutationEngine
+
+
+def checkpoint_path(params, seed):
+    """
+    File of the checkpoints of a run: `checkpoint_path` in params, or <output>/checkpoints/<prob_name>_<seed>.npz
+    """
+    if 'checkpoint_path' in params:
+        return params['checkpoint_path']
+    return f"./{params['output']}/checkpoints/{params['prob_name']}_{seed}.npz"
+
+
+def save_checkpoint(path, moead, policies=(), history=None):
+    """
+    Write the complete state of an AMOEAD (or MOEAD) between two generations to path, atomically
+
+    All the state is stored as NumPy arrays in one uncompressed .npz file
+    (the scalars, RNG states of `random`, `np.random` and the generator of
+    the mutations, as a JSON string), so it is written and read quickly and
+    without pickle. The file is written next to path, fsynced and renamed
+    over it, so a run killed while writing leaves the previous checkpoint.
+
+    parameter
+    ----------
+    path: str
+      checkpoint file
+    moead: AMOEAD or MOEAD
+      optimizer, at the start of a generation
+    policies: list
+      SnapshotPolicy of the run, whose position and recorded indicators are saved too
+    history: object
+      history recorder of the run; it is flushed, and the size of a binary history is saved
+    """
+    arrays = {key: np.asarray(getattr(moead, key)) for key in STATE_ARRAYS if hasattr(moead, key)}
+
+    version, internal, gauss_next = random.getstate()
+    arrays['random'] = np.array(internal, dtype=np.int64)
+    name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    arrays['np_random'] = keys
+    meta = {'c_gen': moead.c_gen, 'n_fe': moead.n_fe, 'seed': moead.seed,
+            'prob_name': moead.prob_name, 'n_obj': moead.n_obj, 'n_var': moead.n_var, 'n_pop': moead.n_pop,
+            'random': [version, gauss_next], 'np_random': [name, pos, has_gauss, cached_gaussian]}
+
+    if hasattr(moead, 'n_hits'):
+        meta['n_hits'] = moead.n_hits
+    if hasattr(moead, 'EP'):
+        arrays['EP_F'] = moead.EP.objectives
+        arrays['EP_X'] = moead.EP.decisions
+        meta['EP_limit'], meta['EP_capacity'] = moead.EP.limit, moead.EP.capacity
+    if hasattr(moead, 'rng'):
+        meta['rng'] = moead.rng.bit_generator.state
+    if getattr(moead, 'mutation_engine', None) is not None:
+        meta['engine_next'] = {}
+        for key in ENGINE_BLOCKS:
+            blocks = getattr(moead.mutation_engine, key)
+            meta['engine_next'][key] = blocks.next
+            if blocks.rows is not None:
+                arrays[f'engine_{key}'] = blocks.rows                           # variates drawn but not used yet
+    if getattr(moead, 'cache', None) is not None:
+        cache = moead.cache
+        keys = list(cache.entries)                                              # in LRU order
+        arrays['cache_keys'] = np.frombuffer(b''.join(keys), dtype=np.uint8).reshape(len(keys), len(keys[0]) if keys else 0)
+        arrays['cache_values'] = np.array(list(cache.entries.values())).reshape(len(keys), moead.n_obj)
+        meta['cache'] = [cache.hits, cache.misses]
+
+    meta['policies'] = []
+    for k, policy in enumerate(policies):
+        meta['policies'].append([policy.next, policy.last_n_fe])
+        if policy.checkpoints is not None:
+            arrays[f'policy_{k}_checkpoints'] = policy.checkpoints
+        if hasattr(policy.recorder, 'rows'):                                    # IndicatorRecorder keeps its rows in memory
+            arrays[f'policy_{k}_rows'] = np.array(policy.recorder.rows, dtype=float).reshape(-1, 4)
+        if getattr(policy.recorder, 'bounds', None) is not None:               # and its HV scaling bounds
+            arrays[f'policy_{k}_bounds'] = policy.recorder.bounds
+    meta['history_offset'] = history.flush() if history is not None else None
+
+    arrays['meta'] = np.array(json.dumps(meta))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):                                                 # e.g. disk full: keep the previous checkpoint only
+            os.remove(tmp)
+        raise
+
+
+def remove_stale_files(path):
+    """
+    Remove the temporary files of save_checkpoint (path.<pid>.tmp) left by a process killed while writing
+    """
+    for tmp in glob.glob(f'{glob.escape(path)}.*.tmp'):
+        os.remove(tmp)
+
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint written by save_checkpoint
+
+    return
+    ----------
+    tuple
+      the arrays (dict) and the scalars (dict) of the checkpoint
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+    meta = json.loads(str(arrays.pop('meta')))
+    return arrays, meta
+
+
+def restore_checkpoint(moead, arrays, meta, policies=()):
+    """
+    Put the state of a checkpoint into an AMOEAD (or MOEAD) built with the same params (and the W, X, Y of the checkpoint)
+
+    The RNG states are restored last, so the run continues exactly as the
+    one that wrote the checkpoint.
+    """
+    for key in ('prob_name', 'n_obj', 'n_var', 'n_pop'):
+        if getattr(moead, key) != meta[key]:
+            raise ValueError(f'the checkpoint has {key} {meta[key]}, the config {getattr(moead, key)}')
+
+    for key in STATE_ARRAYS:
+        if key in arrays:
+            setattr(moead, key, arrays[key].copy())
+    if hasattr(moead, 'share_population'):
+        moead.share_population()
+    moead.c_gen = meta['c_gen']
+    moead.n_fe = meta['n_fe']
+    moead.seed = meta['seed']
+    if 'n_hits' in meta:
+        moead.n_hits = meta['n_hits']
+
+    if 'EP_F' in arrays:
+        EP = ExternalPopulation(moead.n_obj, moead.n_var, meta['EP_limit'], meta['EP_capacity'])
+        EP.size = len(arrays['EP_F'])
+        EP.F[:EP.size] = arrays['EP_F']
+        EP.X[:EP.size] = arrays['EP_X']
+        moead.EP = EP
+
+    if getattr(moead, 'mutation_engine', None) is not None:
+        for key in ENGINE_BLOCKS:
+            blocks = getattr(moead.mutation_engine, key)
+            blocks.next = meta['engine_next'][key]
+            blocks.rows = arrays.get(f'engine_{key}')
+    if getattr(moead, 'cache', None) is not None:
+        cache = moead.cache
+        cache.entries.clear()
+        for key, value in zip(arrays['cache_keys'], arrays['cache_values']):
+            cache.entries[key.tobytes()] = value.copy()
+        cache.hits, cache.misses = meta['cache']
+
+    for k, policy in enumerate(policies):
+        policy.next, policy.last_n_fe = meta['policies'][k]
+        policy.checkpoints = arrays.get(f'policy_{k}_checkpoints')
+        if f'policy_{k}_rows' in arrays:
+            policy.recorder.rows = [tuple(row) for row in arrays[f'policy_{k}_rows']]
+        if f'policy_{k}_bounds' in arrays:
+            policy.recorder.bounds = arrays[f'policy_{k}_bounds'].copy()
+
+    version, gauss_next = meta['random']
+    random.setstate((version, tuple(int(v) for v in arrays['random']), gauss_next))
+    name, pos, has_gauss, cached_gaussian = meta['np_random']
+    np.random.set_state((name, arrays['np_random'], pos, has_gauss, cached_gaussian))
+    if 'rng' in meta:
+        moead.rng.bit_generator.state = meta['rng']
+
+
+class Checkpointer:
+    """
+    Save a checkpoint at the start of a generation every `every` generations and/or every `seconds` seconds
+
+    It is called with the optimizer before the snapshot policies, so after
+    a resume the generation of the checkpoint is recorded exactly once.
+    Temporary files left next to path by a process killed while writing a
+    checkpoint are removed when the Checkpointer is created.
+
+    parameter
+    ----------
+    path: str
+      checkpoint file
+    every: int
+      generations between two checkpoints (0: not by generations)
+    seconds: float
+      seconds between two checkpoints (0: not by time)
+    policies, history:
+      run state saved with the optimizer, see save_checkpoint
+    """
+
+    def __init__(self, path, every=0, seconds=0, policies=(), history=None):
+        self.path = path
+        self.every = int(every)
+        self.seconds = float(seconds)
+        self.policies = policies
+        self.history = history
+        self.last_gen = None
+        self.last_time = time.monotonic()
+        remove_stale_files(path)
+
+    def __call__(self, moead):
+        if self.last_gen is None:                                               # first generation of this process, or the checkpoint just resumed from
+            self.last_gen = moead.c_gen
+            return
+        due = self.every > 0 and moead.c_gen - self.last_gen >= self.every
+        due = due or (self.seconds > 0 and time.monotonic() - self.last_time >= self.seconds)
+        if due:
+            save_checkpoint(self.path, moead, self.policies, self.history)
+            self.last_gen = moead.c_gen
+            self.last_time = time.monotonic()
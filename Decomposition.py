@@ -1,12 +1,5 @@
 import numpy as np
-
-def agg_value(agg_function, y, w, ref_point):
-
-    if agg_function == "wt":
-        scalar_value = tchebycheff(y, w, ref_point)
-    
-    return scalar_value
-
+from functools import partial
 
 def tchebycheff(y, w, ref_point):
     """
@@ -25,4 +18,87 @@ def tchebycheff(y, w, ref_point):
     float
       Tchebycheff cost value
     """
-    return np.max( w * np.abs(y - ref_point) )
\ No newline at end of file
+    return np.max( w * np.abs(y - ref_point) )
+
+def agg_values(agg_function, Y, W, ref_point):
+    """
+    Compute the scalar aggregation values of a block of points, row by row
+
+    parameter
+    ----------
+    agg_function: str
+      name of the scalar aggregation function (see aggregation)
+    Y: 2D-Array
+      fitness values, one row per point (a 1D-Array is broadcast to every row of W)
+    W: 2D-Array
+      weight vectors, one row per point
+    ref_point: reference point
+
+    return
+    ----------
+    1D-Array
+      scalar aggregation value of each row
+    """
+    return aggregation(agg_function)(Y, W, ref_point)
+
+
+# Scalarizing functions on blocks: the last axis holds the objectives.
+# Y and W broadcast against each other, so the same function computes
+# the values of paired rows (Y and W of shape (n, n_obj)), of one point
+# for many weights (y of shape (n_obj,)) or the whole (n_points,
+# n_weights) matrix (Y[:, None, :] with W[None, :, :], see agg_matrix).
+
+def weighted_sum_values(Y, W, ref_point):
+    return np.sum( W * (Y - ref_point), axis=-1 )
+
+def tchebycheff_values(Y, W, ref_point):
+    return np.max( W * np.abs(Y - ref_point), axis=-1 )
+
+def augmented_tchebycheff_values(Y, W, ref_point, rho=0.01):
+    D = np.abs(Y - ref_point)
+    return np.max( W * D, axis=-1 ) + rho * np.sum( D, axis=-1 )
+
+def pbi_values(Y, W, ref_point, theta=5.0):
+    """
+    Penalty-based boundary intersection: distance d1 along the weight vector plus theta times the distance d2 to it
+    """
+    norm = np.linalg.norm(W, axis=-1, keepdims=True)
+    direction = np.divide(W, norm, out=np.zeros(np.broadcast(W, norm).shape), where=norm > 0)   # a zero weight vector has no direction
+    D = Y - ref_point
+    d1 = np.sum( D * direction, axis=-1 )
+    d2 = np.linalg.norm( D - d1[..., None] * direction, axis=-1 )
+    return d1 + theta * d2
+
+def aggregation(agg_function, params=None):
+    """
+    Resolve the name of a scalar aggregation function once
+
+    parameter
+    ----------
+    agg_function: str
+      'wt' (Tchebycheff), 'ws' (weighted sum), 'atch' (augmented Tchebycheff,
+      with atch_rho in params) or 'pbi' (with pbi_theta in params)
+    params: dict
+      configuration of the run, for the parameters of the functions
+
+    return
+    ----------
+    method
+      function of (Y, W, ref_point) returning the aggregation values over the last axis
+    """
+    params = {} if params is None else params
+    if agg_function == "wt":
+        return tchebycheff_values
+    elif agg_function == "ws":
+        return weighted_sum_values
+    elif agg_function == "atch":
+        return partial(augmented_tchebycheff_values, rho=float(params.get('atch_rho', 0.01)))
+    elif agg_function == "pbi":
+        return partial(pbi_values, theta=float(params.get('pbi_theta', 5.0)))
+    raise ValueError(f'unknown agg_function {agg_function}')
+
+def agg_matrix(aggregate, Y, W, ref_point):
+    """
+    Aggregation values of every point of Y with every weight vector of W, as an (n_points, n_weights) matrix
+    """
+    return aggregate(np.atleast_2d(Y)[:, None, :], np.atleast_2d(W)[None, :, :], ref_point)
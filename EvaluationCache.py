@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from Population import eval_pop
+
+
+class EvaluationCache:
+    """
+    Bounded LRU cache of fitness values in front of a problem callable
+
+    The key of a decision vector is its bytes after rounding to a multiple
+    of `quantum` (quantum 0 keeps the exact float64 values, with -0.0 and
+    0.0 merged), so offspring clipped onto the bounds by fix_bound or
+    left unchanged by the mutations are not evaluated again. Calling the
+    cache with a vector evaluates it like the problem; calling it with a
+    matrix evaluates the missing rows with eval_pop in one call (on the
+    evaluator pool, if any). `hits` and `misses` count the looked up
+    vectors, `last_hits` the hits of the last call.
+
+    parameter
+    ----------
+    problem: method
+      objective function returned by Factory.set_problem
+    prob_name: str
+      name of the problem, to evaluate matrices with eval_pop
+    size: int
+      maximum number of cached vectors; the least recently used is dropped
+    quantum: float
+      resolution of the keys
+    pool: EvaluatorPool
+      optional pool used for the missing rows of a matrix
+    """
+
+    def __init__(self, problem, prob_name, size=10000, quantum=0.0, pool=None):
+        self.problem = problem
+        self.prob_name = prob_name
+        self.size = int(size)
+        self.quantum = float(quantum)
+        self.pool = pool
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()                                            # lookups may come from the threads of an executor
+        self.hits = 0
+        self.misses = 0
+        self.last_hits = 0
+        self.last_hit_mask = np.zeros(0, dtype=bool)
+
+    def key(self, x):
+        if self.quantum > 0:
+            return np.round(np.asarray(x, dtype=float) / self.quantum).astype(np.int64).tobytes()
+        return (np.asarray(x, dtype=float) + 0.0).tobytes()
+
+    def lookup(self, x):
+        """
+        Cached fitness values of x (a copy), or None
+        """
+        key = self.key(x)
+        with self.lock:
+            f = self.entries.get(key)
+            if f is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)                                       # most recently used
+            self.hits += 1
+        return f.copy()
+
+    def store(self, x, f):
+        key = self.key(x)
+        with self.lock:
+            self.entries[key] = np.array(f, dtype=float)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)                                # least recently used
+
+    def __call__(self, X):
+        if np.ndim(X) == 1:
+            f = self.lookup(X)
+            self.last_hits = int(f is not None)
+            if f is None:
+                f = self.problem(X)
+                self.store(X, f)
+            return f
+
+        X = np.asarray(X)
+        F = [self.lookup(x) for x in X]
+        self.last_hit_mask = np.array([f is not None for f in F], dtype=bool)
+        self.last_hits = int(np.sum(self.last_hit_mask))
+        missing = np.flatnonzero(~self.last_hit_mask)
+        if len(missing) > 0:
+            F_missing = eval_pop(X[missing], self.problem, self.prob_name, self.pool)
+            for row, f in zip(missing, F_missing):
+                F[row] = f
+                self.store(X[row], f)
+        return np.array(F)
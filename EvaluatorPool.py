@@ -0,0 +1,203 @@
+import multiprocessing as mp
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+
+from Factory import set_problem
+from Population import eval_pop
+from SharedArrays import SharedArrays
+
+
+PROBLEM_KEYS = ('prob_name', 'n_var', 'n_obj', 'xu', 'xl')                   # what a worker needs to build the problem
+worker_problem = None                                                           # problem of an executor process
+
+
+def init_executor_worker(params):
+    global worker_problem
+    worker_problem = set_problem(params['prob_name'], params['n_var'], params['n_obj'], params['xu'], params['xl'])
+
+
+def evaluate_in_worker(x):
+    return worker_problem(x)
+
+
+def evaluation_executor(params, problem, kind, n_workers):
+    """
+    Executor for evaluating single offspring concurrently
+
+    parameter
+    ----------
+    params: dict
+      configuration of the run
+    problem: method
+      objective function of the run
+    kind: str
+      'thread' (for objectives that wait on I/O or release the GIL, e.g. a
+      call to a simulation daemon) or 'process' (each process builds its
+      own problem with set_problem)
+    n_workers: int
+      number of threads or processes
+
+    return
+    ----------
+    tuple
+      the executor and the function to submit with a decision vector
+    """
+    if kind == 'thread':
+        return ThreadPoolExecutor(n_workers), problem
+    elif kind == 'process':
+        worker_params = {key: params[key] for key in PROBLEM_KEYS}
+        return ProcessPoolExecutor(n_workers, initializer=init_executor_worker, initargs=(worker_params,)), evaluate_in_worker
+    raise ValueError(f'unknown async_executor {kind}')
+
+
+def evaluator_worker(spec, params, tasks, results):
+    """
+    Evaluate blocks of rows of the shared arrays until a None task is received
+
+    Each task is (source, target, start, stop): the rows start:stop of the
+    decision array `source` are evaluated and written to the same rows of
+    the objective array `target`.
+    """
+    shared = SharedArrays.attach(spec)
+    problem = set_problem(params['prob_name'], params['n_var'], params['n_obj'], params['xu'], params['xl'])
+    try:
+        for task in iter(tasks.get, None):
+            source, target, start, stop = task
+            try:
+                shared[target][start:stop] = eval_pop(shared[source][start:stop], problem, params['prob_name'])
+                results.put((stop - start, None))
+            except Exception:
+                results.put((0, traceback.format_exc()))
+    finally:
+        shared.close()
+
+
+class EvaluatorPool:
+    """
+    A pool of evaluator processes working in place on shared-memory populations
+
+    The population (X, Y) and an offspring buffer (X_off, Y_off) of n_pop
+    rows live in multiprocessing.shared_memory blocks (see SharedArrays).
+    To evaluate, the pool only sends row ranges to the workers; they read
+    the decision vectors and write the fitness values back in place, so no
+    array is pickled. Each worker builds its own problem with set_problem.
+
+    parameter
+    ----------
+    params: dict
+      configuration of the run (prob_name, n_var, n_obj, xl, xu)
+    n_pop: int
+      number of rows of the population and of the offspring buffer
+    n_workers: int
+      number of evaluator processes
+    """
+
+    def __init__(self, params, n_pop, n_workers):
+        n_var, n_obj = params['n_var'], params['n_obj']
+        self.n_workers = n_workers
+        self.shared = SharedArrays({'X': (n_pop, n_var), 'Y': (n_pop, n_obj),
+                                    'X_off': (n_pop, n_var), 'Y_off': (n_pop, n_obj)})
+        self.tasks = mp.Queue()
+        self.results = mp.Queue()
+        worker_params = {key: params[key] for key in PROBLEM_KEYS}
+        self.workers = [mp.Process(target=evaluator_worker, args=(self.shared.spec, worker_params, self.tasks, self.results),
+                                   daemon=True)
+                        for _ in range(n_workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def __getitem__(self, key):
+        return self.shared[key]
+
+    def evaluate(self, X):
+        """
+        Evaluate the rows of X on the pool
+
+        When X is (a leading slice of) the population X or the offspring
+        buffer X_off, it is evaluated in place and the matching rows of Y or
+        Y_off are returned; any other matrix is first copied into X_off.
+
+        parameter
+        ----------
+        X: 2D-Array
+          decision vectors, one row per individual
+
+        return
+        ----------
+        2D-Array
+          fitness values, one row per individual (a view of the shared Y or Y_off)
+        """
+        n = len(X)
+        arrays = self.shared_rows(X)
+        if arrays is not None:                                                  # leading rows of X or X_off
+            source, target = arrays
+        else:
+            Y = np.empty((n, self.shared['Y_off'].shape[1]))
+            size = len(self.shared['X_off'])
+            for start in range(0, n, size):                                     # matrices larger than the buffer go through it in parts
+                stop = min(start + size, n)
+                self.shared['X_off'][:stop - start] = X[start:stop]
+                Y[start:stop] = self.evaluate(self.shared['X_off'][:stop - start])
+            return Y
+
+        self.run(source, target, n)
+        return self.shared[target][:n]
+
+    def shared_rows(self, X):
+        """
+        Names of the shared arrays (source, target) if X is exactly the leading rows of X or X_off, else None
+
+        X must be in the same memory, start at its first row and have its
+        dtype, row width and strides; any other view (an offset, a column
+        slice, a step) is evaluated through a copy.
+        """
+        for source, target in (('X', 'Y'), ('X_off', 'Y_off')):
+            shared = self.shared[source]
+            if not np.shares_memory(X, shared):
+                continue
+            offset = X.__array_interface__['data'][0] - shared.__array_interface__['data'][0]
+            if (offset == 0 and X.dtype == shared.dtype and X.ndim == 2 and X.shape[1] == shared.shape[1]
+                    and X.strides == shared.strides and len(X) <= len(shared)):
+                return source, target
+        return None
+
+    def run(self, source, target, n):
+        """
+        Evaluate rows 0:n of the shared array source into target, in about 4 blocks per worker
+        """
+        bounds = np.linspace(0, n, min(n, 4 * self.n_workers) + 1).astype(int)  # balance the blocks of slow evaluations
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            self.tasks.put((source, target, int(start), int(stop)))
+
+        done = 0
+        errors = []
+        for _ in range(len(bounds) - 1):
+            while True:
+                try:
+                    rows, error = self.results.get(timeout=1)
+                    break
+                except queue.Empty:
+                    if not all(worker.is_alive() for worker in self.workers):
+                        raise RuntimeError('an evaluator process died')
+            done += rows
+            if error is not None:
+                errors.append(error)
+        if errors:
+            raise RuntimeError(f'evaluation failed in an evaluator process:\n{errors[0]}')
+        return done
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory
+        """
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+        self.tasks.close()
+        self.results.close()
+        self.shared.close()
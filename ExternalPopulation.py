@@ -0,0 +1,124 @@
+import numpy as np
+from SparsityTruncation import removal_order
+
+
+class ExternalPopulation:
+    """
+    External population (EP) of non-dominated solutions
+
+    Objective values and decision variables are kept in preallocated arrays,
+    with the members sorted by their first objective. A new solution is only
+    compared with the members that can dominate it (first objective not
+    larger) or that it can dominate (first objective not smaller), in one
+    vectorized operation; for 2 objectives both checks are binary searches.
+
+    The archive is allowed to grow past its limit up to its capacity, and is
+    then truncated back to the limit in one go (see truncate), instead of
+    removing one solution after every insertion.
+
+    With count_checks set (by PhaseProfiler), `checks` counts the dominance
+    checks made by add: the members compared with a new solution or, for 2
+    objectives, the steps of the binary searches and the comparison with
+    the closest member.
+
+    parameter
+    ----------
+    n_obj: int
+      number of objectives
+    n_var: int
+      number of decision variables
+    limit: int
+      number of solutions kept after a truncation
+    capacity: int
+      number of solutions stored before a truncation is forced (default: 2 * limit)
+    """
+
+    def __init__(self, n_obj, n_var, limit, capacity=None):
+        self.n_obj = n_obj
+        self.n_var = n_var
+        self.limit = int(limit)
+        self.capacity = max(int(capacity or 2 * self.limit), self.limit + 1)
+        self.F = np.empty((self.capacity, n_obj))                              # objective values, sorted by the first objective
+        self.X = np.empty((self.capacity, n_var))                              # decision variables, same order as F
+        self.size = 0
+        self.count_checks = False                                               # only set when profiling
+        self.checks = 0                                                         # dominance checks made by add
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def objectives(self):
+        return self.F[:self.size]
+
+    @property
+    def decisions(self):
+        return self.X[:self.size]
+
+    def add(self, f, x):
+        """
+        Insert a solution if no member weakly dominates it, removing the members it dominates
+
+        parameter
+        ----------
+        f: 1D-Array
+          objective values of the solution
+        x: 1D-Array
+          decision variables of the solution
+
+        return
+        ----------
+        bool
+          True if the solution was inserted
+        """
+        F = self.F[:self.size]
+        left = int(np.searchsorted(F[:, 0], f[0], 'left'))                      # members from left on can be dominated by f
+        right = int(np.searchsorted(F[:, 0], f[0], 'right'))                    # members before right can dominate f
+
+        if self.n_obj == 2:                                                     # f2 decreases along the sorted archive
+            if self.count_checks:                                               # steps of the two binary searches, closest member
+                self.checks += 2 * self.size.bit_length() + (right > 0)
+            if right > 0 and F[right - 1, 1] <= f[1]:
+                return False
+            if self.count_checks:
+                self.checks += (self.size - left).bit_length()
+            end = left + int(np.searchsorted(-F[left:, 1], -f[1], 'right'))     # members in [left, end) are dominated by f
+            self._replace(left, np.arange(left, end), f, x)
+            return True
+
+        weakly_dominated = np.any(np.all(F[:right] <= f, axis=1))
+        if self.count_checks:
+            self.checks += right if weakly_dominated else right + self.size - left
+        if weakly_dominated:                                                    # f is weakly dominated by a member
+            return False
+        dominated = left + np.flatnonzero(np.all(F[left:] >= f, axis=1))
+        self._replace(left, dominated, f, x)
+        return True
+
+    def truncate(self):
+        """
+        Remove the most crowded solutions until the archive is back to its limit
+        """
+        if self.size > self.limit:
+            self._remove(removal_order(self.objectives, self.n_obj, self.size - self.limit))
+
+    def _replace(self, position, dominated, f, x):
+        if len(dominated) > 0:
+            self._remove(dominated)
+        elif self.size == self.capacity:
+            self.truncate()
+            position = int(np.searchsorted(self.F[:self.size, 0], f[0], 'left'))
+
+        self.F[position + 1:self.size + 1] = self.F[position:self.size]        # shift the tail to open a slot
+        self.X[position + 1:self.size + 1] = self.X[position:self.size]
+        self.F[position] = f
+        self.X[position] = x
+        self.size += 1
+
+    def _remove(self, indices):
+        keep = np.ones(self.size, dtype=bool)
+        keep[indices] = False
+        n_keep = int(np.sum(keep))
+        self.F[:n_keep] = self.F[:self.size][keep]
+        self.X[:n_keep] = self.X[:self.size][keep]
+        self.size = n_keep
@@ -6,8 +6,19 @@ import numpy as np
 from pymoo.factory import get_problem, get_reference_directions, get_visualization
 from pymoo.util.plotting import plot
 
+memo = None                                                                     # {(prob_name, n_var, n_obj): problem} of this process, set to {} by RunExperiments' workers
+
 def set_problem(prob_name, n_var = 0, n_obj = 0, xu = 0, xl = 0):
 
+	if memo is not None:
+		key = (prob_name, n_var, n_obj)
+		if key not in memo:
+			memo[key] = build_problem(prob_name, n_var, n_obj, xu, xl)
+		return memo[key]
+	return build_problem(prob_name, n_var, n_obj, xu, xl)
+
+def build_problem(prob_name, n_var = 0, n_obj = 0, xu = 0, xl = 0):
+
 	benchmark_name = ''.join(i for i in prob_name if not i.isdigit())
 
 	if benchmark_name == 'dtlz' or benchmark_name == 'DTLZ':
@@ -32,34 +43,34 @@ def dtlz_benchmark(prob_name, n_var = 0, n_obj = 0, xu = 0, xl = 0):
 
 def uf_benchmark(prob_name):
 	if prob_name == "uf1" or prob_name == "UF1":
-		return MOOP.UF1
+		return MOOP.UF1_pop
 
 	elif prob_name == "uf2" or prob_name == "UF2":
-		return MOOP.UF2
+		return MOOP.UF2_pop
 
 	elif prob_name == "uf3" or prob_name == "UF3":
-		return MOOP.UF3
+		return MOOP.UF3_pop
 
 	elif prob_name == "uf4" or prob_name == "UF4":
-		return MOOP.UF4
+		return MOOP.UF4_pop
 
 	elif prob_name == "uf5" or prob_name == "UF5":
-		return MOOP.UF5
+		return MOOP.UF5_pop
 
 	elif prob_name == "uf6" or prob_name == "UF6":
-		return MOOP.UF6
+		return MOOP.UF6_pop
 
 	elif prob_name == "uf7" or prob_name == "UF7":
-		return MOOP.UF7
+		return MOOP.UF7_pop
 
 	elif prob_name == "uf8" or prob_name == "UF8":
-		return MOOP.UF8
+		return MOOP.UF8_pop
 
 	elif prob_name == "uf9" or prob_name == "UF9":
-		return MOOP.UF9
+		return MOOP.UF9_pop
 
 	elif prob_name == "uf10" or prob_name == "UF10":
-		return MOOP.UF10
+		return MOOP.UF10_pop
 	
 	else:
 		return False
\ No newline at end of file
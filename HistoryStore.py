@@ -0,0 +1,184 @@
+import os
+import sys
+import numpy as np
+
+#################################################################
+# history file layout (little-endian)                            #
+#   file header:   MAGIC (8 bytes), n_obj, n_var (int64)         #
+#   per record:    n_fe, c_gen, n_rows (int64),                  #
+#                  Y (n_rows x n_obj float64, row-major),        #
+#                  X (n_rows x n_var float64, row-major)         #
+# records are only ever appended, one per recorded generation    #
+#################################################################
+MAGIC = b'MOEADHS1'
+FILE_HEADER = np.dtype([('magic', 'S8'), ('n_obj', '<i8'), ('n_var', '<i8')])
+RECORD_HEADER = np.dtype([('n_fe', '<i8'), ('c_gen', '<i8'), ('n_rows', '<i8')])
+
+
+class HistoryWriter:
+    """
+    Append the (Y, X, n_fe, c_gen) of each recorded generation to a single binary file
+
+    parameter
+    ----------
+    path: str
+      history file of the run; an existing file is overwritten
+    n_obj: int
+      number of objectives
+    n_var: int
+      number of decision variables
+    offset: int
+      to resume a run: keep the first offset bytes of the existing file (as
+      returned by flush at the checkpoint) and append after them
+    """
+
+    def __init__(self, path, n_obj, n_var, offset=None):
+        self.path = path
+        self.n_obj = n_obj
+        self.n_var = n_var
+        if offset is None:
+            self.file = open(path, 'wb')
+            np.array([(MAGIC, n_obj, n_var)], dtype=FILE_HEADER).tofile(self.file)
+        else:
+            self.file = open(path, 'r+b')
+            self.file.truncate(offset)                                          # generations recorded after the checkpoint are recorded again
+            self.file.seek(offset)
+
+    def append(self, Y, X, n_fe, c_gen):
+        """
+        Append one generation to the file
+        """
+        np.array([(n_fe, c_gen, len(Y))], dtype=RECORD_HEADER).tofile(self.file)
+        np.ascontiguousarray(Y, dtype='<f8').tofile(self.file)
+        np.ascontiguousarray(X, dtype='<f8').tofile(self.file)
+
+    def flush(self):
+        """
+        Make the generations appended so far durable
+
+        return
+        ----------
+        int
+          size of the file, to resume from
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HistoryReader:
+    """
+    Index a history file and memory-map any of its generations
+
+    parameter
+    ----------
+    path: str
+      history file written by HistoryWriter
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=FILE_HEADER, count=1)
+        if len(header) == 0 or header['magic'][0] != MAGIC:
+            raise ValueError(f'{path} is not a history file')
+        self.n_obj = int(header['n_obj'][0])
+        self.n_var = int(header['n_var'][0])
+
+        size = os.path.getsize(path)
+        offset = FILE_HEADER.itemsize
+        records = []
+        with open(path, 'rb') as f:
+            while offset + RECORD_HEADER.itemsize <= size:                      # walk the record headers only
+                f.seek(offset)
+                n_fe, c_gen, n_rows = np.fromfile(f, dtype=RECORD_HEADER, count=1)[0]
+                data = offset + RECORD_HEADER.itemsize
+                end = data + 8 * int(n_rows) * (self.n_obj + self.n_var)
+                if end > size:                                                  # partially written last record
+                    break
+                records.append((int(n_fe), int(c_gen), int(n_rows), data))
+                offset = end
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def n_fe(self):
+        return np.array([r[0] for r in self.records])
+
+    @property
+    def c_gen(self):
+        return np.array([r[1] for r in self.records])
+
+    def generation(self, k):
+        """
+        Memory-map the k-th recorded generation
+
+        return
+        ----------
+        tuple
+          Y (2D-Array), X (2D-Array), n_fe (int), c_gen (int); Y and X are read-only memmaps
+        """
+        n_fe, c_gen, n_rows, data = self.records[k]
+        Y = np.memmap(self.path, dtype='<f8', mode='r', offset=data, shape=(n_rows, self.n_obj))
+        X = np.memmap(self.path, dtype='<f8', mode='r', offset=data + 8 * n_rows * self.n_obj,
+                      shape=(n_rows, self.n_var))
+        return Y, X, n_fe, c_gen
+
+
+def names_by_n_fe(params):
+    """
+    Whether the CSV files of a history are named by n_fe instead of c_gen
+
+    The 'checkpoints' and 'geometric' snapshot policies can record several
+    snapshots in one generation, so their files are named by n_fe.
+    """
+    return params.get('snapshot_policy', 'generation') != 'generation'
+
+
+def export_csv(path, folder, by_n_fe=None):
+    """
+    Write a history file as the `{c_gen}_paretos.csv` / `{c_gen}_info_gen.csv` files read by hypervolume_evolution.R
+
+    parameter
+    ----------
+    path: str
+      history file written by HistoryWriter
+    folder: str
+      folder of the CSV files
+    by_n_fe: bool
+      name the files by n_fe (see names_by_n_fe); None names them by n_fe
+      when some generation has several records, so none is overwritten
+    """
+    os.makedirs(folder, exist_ok=True)
+    reader = HistoryReader(path)
+    if by_n_fe is None:
+        by_n_fe = len(np.unique(reader.c_gen)) < len(reader)
+    for k in range(len(reader)):
+        Y, X, n_fe, c_gen = reader.generation(k)
+        name = n_fe if by_n_fe else c_gen
+        np.savetxt(f'{folder}/{name}_paretos.csv', np.hstack([Y, X]))
+        np.savetxt(f'{folder}/{name}_info_gen.csv', np.hstack([n_fe, c_gen]))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (3, 4):
+        print('usage: python3 HistoryStore.py <history file> <output folder> [config.yml]')
+        sys.exit(1)
+    by_n_fe = None
+    if len(sys.argv) == 4:                                                      # the naming of the CSV history of the config
+        import yaml
+        with open(sys.argv[3]) as f:
+            by_n_fe = names_by_n_fe(yaml.safe_load(f))
+    export_csv(sys.argv[1], sys.argv[2], by_n_fe)
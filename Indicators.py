@@ -0,0 +1,174 @@
+import bisect
+import numpy as np
+from scipy.spatial.distance import cdist
+
+
+def scaling_Y(Y, R):
+    """
+    Linearly scale Y with the bounds of Y and R together, as scaling_Y in hypervolume_evolution.R
+
+    parameter
+    ----------
+    Y: 2D-Array
+      fitness values to scale, one row per solution
+    R: 2D-Array
+      points that also set the bounds (in the R scripts, the final fronts of all the runs)
+
+    return
+    ----------
+    2D-Array
+      scaled fitness values
+    """
+    P = np.vstack([Y, R])
+    minP = np.min(P, axis=0)
+    maxP = np.max(P, axis=0)
+    return (Y - minP) / (maxP - minP + 1e-16)
+
+
+def hypervolume(Y, ref_point, n_samples=100000, seed=0):
+    """
+    Hypervolume dominated by Y and bounded by ref_point
+
+    Exact for 2 objectives (sort and sweep) and 3 objectives (sweep along
+    the third objective over 2D slices), Monte-Carlo estimate with n_samples
+    points otherwise. Points that do not strictly dominate ref_point do not
+    contribute, as in emoa::dominated_hypervolume.
+
+    parameter
+    ----------
+    Y: 2D-Array
+      fitness values, one row per solution (minimization)
+    ref_point: 1D-Array
+      reference point
+    n_samples: int
+      number of samples of the Monte-Carlo estimate
+    seed: int
+      seed of the Monte-Carlo estimate (a separate generator, the run's RNG is not touched)
+
+    return
+    ----------
+    float
+      hypervolume
+    """
+    Y = np.asarray(Y, dtype=float)
+    ref_point = np.broadcast_to(np.asarray(ref_point, dtype=float), (Y.shape[1],))
+    Y = Y[np.all(Y < ref_point, axis=1)]
+    if len(Y) == 0:
+        return 0.0
+
+    if Y.shape[1] == 2:
+        return hv_2d(Y, ref_point)
+    elif Y.shape[1] == 3:
+        return hv_3d(Y, ref_point)
+    return hv_monte_carlo(Y, ref_point, n_samples, seed)
+
+
+def hv_2d(Y, ref_point):
+    Y = Y[np.lexsort((Y[:, 1], Y[:, 0]))]                                       # sort by f1, then f2
+    best_f2 = np.minimum.accumulate(Y[:, 1])
+    previous = np.concatenate([[ref_point[1]], best_f2[:-1]])                   # best f2 among the points to the left
+    return float(np.sum((ref_point[0] - Y[:, 0]) * np.maximum(previous - Y[:, 1], 0.0)))
+
+
+def hv_3d(Y, ref_point):
+    Y = Y[np.argsort(Y[:, 2], kind='stable')]                                   # sweep along f3
+    heights = np.diff(np.concatenate([Y[:, 2], [ref_point[2]]]))
+    f1, f2 = [], []                                                             # 2D staircase of the points below the slice: f1 increasing, f2 decreasing
+    area = 0.0                                                                  # area it dominates in (f1, f2)
+    volume = 0.0
+    for (a, b, _), height in zip(Y.tolist(), heights.tolist()):
+        k = bisect.bisect_right(f1, a)
+        top = f2[k - 1] if k > 0 else ref_point[1]
+        if b < top:                                                             # else weakly dominated by its left neighbour
+            x, level, j = a, top, k
+            while j < len(f1) and f2[j] >= b:                                   # right neighbours dominated by (a, b)
+                area += (f1[j] - x) * (level - b)
+                x, level, j = f1[j], f2[j], j + 1
+            area += ((f1[j] if j < len(f1) else ref_point[0]) - x) * (level - b)
+            f1[k:j] = [a]
+            f2[k:j] = [b]
+        if height > 0:
+            volume += area * height                                             # slice dominated by the points below it
+    return float(volume)
+
+
+def hv_monte_carlo(Y, ref_point, n_samples, seed, chunk=10000):
+    rng = np.random.default_rng(seed)
+    lower = np.min(Y, axis=0)
+    dominated = 0
+    for start in range(0, n_samples, chunk):
+        S = rng.uniform(lower, ref_point, (min(chunk, n_samples - start), len(ref_point)))
+        is_dominated = np.zeros(len(S), dtype=bool)
+        for y in Y:
+            is_dominated |= np.all(y <= S, axis=1)
+        dominated += int(np.sum(is_dominated))
+    return float(np.prod(ref_point - lower) * dominated / n_samples)
+
+
+def igd(Y, front):
+    """
+    Inverted generational distance: mean distance from each point of the reference front to its closest solution
+    """
+    return float(np.mean(np.min(cdist(front, Y), axis=1)))
+
+
+def reference_front(prob_name, n_var, n_obj, path=None):
+    """
+    Reference Pareto front of a problem: read from path if given, else pymoo's front, else None
+    """
+    if path is not None:
+        return np.loadtxt(path)
+
+    benchmark_name = ''.join(i for i in prob_name if not i.isdigit())
+    if benchmark_name == 'dtlz' or benchmark_name == 'DTLZ':
+        from pymoo.factory import get_problem
+        try:
+            return get_problem(prob_name.lower(), n_var, n_obj).pareto_front()
+        except Exception:                                                       # pymoo has no front for this problem and n_obj
+            return None
+    return None
+
+
+class IndicatorRecorder:
+    """
+    Compute HV and IGD of the population whenever it is handed a snapshot
+
+    It has the append(Y, X, n_fe, c_gen) / close() interface of the history
+    recorders, so a SnapshotPolicy decides at which n_fe it runs. HV is
+    computed on the objectives scaled linearly to bounds that are fixed for
+    the whole run, so the values of successive snapshots can be compared:
+    the bounds of the reference front, or without a front (every UF
+    problem) the bounds of the first snapshot, i.e. of the initial
+    population. The reference point is hv_ref_point (default 1 in every
+    objective, as in hypervolume_evolution.R). IGD uses the unscaled
+    objectives and is NaN when there is no reference front.
+
+    parameter
+    ----------
+    params: dict
+      configuration of the run; reads indicator_front, hv_ref_point and hv_samples
+    n_obj, n_var: int
+      number of objectives and of decision variables
+    path: str
+      CSV file written on close (columns n_fe, c_gen, hv, igd); None keeps the rows in memory only
+    """
+
+    def __init__(self, params, n_obj, n_var, path=None):
+        self.front = reference_front(params['prob_name'], n_var, n_obj, params.get('indicator_front'))
+        self.ref_point = np.full(n_obj, float(params.get('hv_ref_point', 1.0)))
+        self.n_samples = int(params.get('hv_samples', 100000))
+        self.path = path
+        self.rows = []
+        self.bounds = None if self.front is None else np.array([np.min(self.front, axis=0), np.max(self.front, axis=0)])
+
+    def append(self, Y, X, n_fe, c_gen):
+        if self.bounds is None:
+            self.bounds = np.array([np.min(Y, axis=0), np.max(Y, axis=0)])     # no reference front: bounds of the first snapshot
+        lower, upper = self.bounds
+        hv = hypervolume((Y - lower) / (upper - lower + 1e-16), self.ref_point, self.n_samples)
+        distance = np.nan if self.front is None else igd(Y, self.front)
+        self.rows.append((n_fe, c_gen, hv, distance))
+
+    def close(self):
+        if self.path is not None:
+            np.savetxt(self.path, np.array(self.rows).reshape(-1, 4), header='n_fe c_gen hv igd')
@@ -0,0 +1,231 @@
+#################################
+# import functions and packages #
+#################################
+import argparse
+import multiprocessing as mp
+import random
+import yaml
+import numpy as np
+
+from AMOEAD import AMOEAD
+from Factory import set_problem
+from WeightVector import weights_and_neighbors, neighbors
+from Population import init_pop, eval_pop
+from PriorityFunctions import priority_values
+from AdaptiveWeightAdjustment import weight_adjustment
+from SharedArrays import SharedArrays
+from Output import make_output_dirs, save_final
+
+
+def split_regions(W, B, n_islands):
+    """
+    Split the weight vectors into contiguous regions, each with the halo of neighbors it needs from other regions
+
+    parameter
+    ----------
+    W: 2D-Array
+      weight vectors, in the order given by get_weights
+    B: 2D-Array
+      neighbor indices of each weight vector
+    n_islands: int
+      number of regions
+
+    return
+    ----------
+    list
+      one (owned, halo) pair of index arrays per region
+    """
+    regions = []
+    for owned in np.array_split(np.arange(len(W)), n_islands):
+        halo = np.setdiff1d(np.unique(B[owned]), owned)                         # neighbors owned by other regions
+        regions.append((owned, halo))
+    return regions
+
+
+class IslandAMOEAD(AMOEAD):
+    """
+    AMOEAD on one region of the weight vectors
+
+    The local population holds the owned subproblems first and the halo
+    (the neighbors owned by other islands) after them. Only owned
+    subproblems create offspring (the halo has priority 0); offspring may
+    replace halo members, but the halo is overwritten by its owners at every
+    migration. The weight adjustment only deletes and adds owned vectors.
+    """
+
+    def __init__(self, params, seed, n_own, W, X, Y, priority):
+        super().__init__(params, seed, W=W, X=X, Y=Y)
+        self.n_own = n_own
+        self.priority_values = np.concatenate([priority, np.zeros(self.n_pop - n_own)])
+
+    def adjust_weights(self):
+        if self.perform_awa != 'True':
+            return
+        o = self.n_own
+        W_own = self.W[:o]
+        X, Y, W, B = weight_adjustment(self.c_gen, W_own, self.X[:o], self.Y[:o], None,
+                                       self.EP, self.ref_point, self.params)      # B of the owned rows is rebuilt below
+        if W is not W_own:                                                      # the owned vectors were adjusted
+            self.X = np.vstack([X, self.X[o:]])
+            self.Y = np.vstack([Y, self.Y[o:]])
+            self.W = np.vstack([W, self.W[o:]])
+            self.B = neighbors(self.W, self.T, self.params)
+            self.share_population()
+
+
+def island_worker(k, params, seed, regions, spec, barrier):
+    """
+    Run island k, migrating every `migration_interval` generations until the global budget is used
+    """
+    shared = SharedArrays.attach(spec)
+    moead = None
+    try:
+        owned, halo = regions[k]
+        local = np.concatenate([owned, halo])
+        n_own = len(owned)
+        n_pop = len(shared['W'])
+        interval = int(params.get('migration_interval', 10))
+
+        island_params = dict(params)
+        island_params['n_eval'] = params['n_eval'] * n_own / n_pop              # share of the budget, keeps the AWA schedule of the whole run
+        moead = IslandAMOEAD(island_params, seed * 10007 + k, n_own,
+                             shared['W'][local], shared['X'][local], shared['Y'][local],
+                             shared['priority'][owned])
+        n_fe_start = moead.n_fe
+
+        while True:
+            for _ in range(interval):
+                moead.step()
+
+            ##################################
+            # publish the state of the island #
+            ##################################
+            shared['W'][owned] = moead.W[:n_own]
+            shared['X'][owned] = moead.X[:n_own]
+            shared['Y'][owned] = moead.Y[:n_own]
+            shared['ref'][k] = moead.ref_point
+            shared['n_fe'][k] = moead.n_fe - n_fe_start
+            shared['n_hits'][k] = moead.n_hits
+            shared['c_gen'][k] = moead.c_gen
+            moead.EP.truncate()
+            size = len(moead.EP)
+            shared['EP_F'][k, :size] = moead.EP.objectives
+            shared['EP_X'][k, :size] = moead.EP.decisions
+            shared['EP_n'][k] = size
+            barrier.wait()
+
+            ################################
+            # read the state of the others #
+            ################################
+            moead.ref_point = np.min(shared['ref'], axis=0)
+            halo_W = shared['W'][halo]
+            if not np.array_equal(halo_W, moead.W[n_own:]):                     # an owner adjusted its vectors
+                moead.W[n_own:] = halo_W
+                moead.B = neighbors(moead.W, moead.T, moead.params)
+            moead.X[n_own:] = shared['X'][halo]
+            moead.Y[n_own:] = shared['Y'][halo]
+            for j in range(len(regions)):
+                if j != k and moead.perform_awa == 'True':
+                    for m in range(int(shared['EP_n'][j])):
+                        moead.EP.add(shared['EP_F'][j, m], shared['EP_X'][j, m])
+            done = n_pop + np.sum(shared['n_fe']) >= params['n_eval']
+            done = done or np.sum(shared['n_hits']) >= params.get('eval_cache_max_hits', params['n_eval'])   # hits not counted in n_fe
+            barrier.wait()
+
+            if done:
+                break
+    except BaseException:
+        barrier.abort()                                                         # release the other islands
+        raise
+    finally:
+        if moead is not None:
+            moead.close()
+        shared.close()
+
+
+def run_islands(params, seed):
+    """
+    Run AMOEAD as one island per process over contiguous regions of the weight vectors
+
+    The initial population is generated and evaluated once, in this
+    process, exactly as AMOEAD does. Every `migration_interval` generations
+    the islands publish their owned solutions, reference point and EP in
+    shared memory, then take the halo solutions, the best reference point
+    and the EP members of the others. The run stops at the first migration
+    where the evaluations of all the islands reach n_eval.
+
+    parameter
+    ----------
+    params: dict
+      configuration of the run; `n_islands` sets the number of processes
+    seed: int
+      seed of the run
+
+    return
+    ----------
+    dict
+      final W, X, Y, n_fe and c_gen of the whole population
+    """
+    random.seed(seed)                                                           # set the seed for reproducibility purposes
+    np.random.seed(seed)                                                        # set the seed for reproducibility purposes
+
+    n_islands = int(params['n_islands'])
+    n_obj, n_var = params['n_obj'], params['n_var']
+    problem = set_problem(params['prob_name'], n_var, n_obj, params['xu'], params['xl'])
+
+    W, B = weights_and_neighbors(params['decomp_method'], params, params['T'])
+    n_pop = len(W)
+    X = init_pop(n_pop, n_var, params['xl'], params['xu'])                      # initialize a population
+    Y = eval_pop(X, problem, params['prob_name'])                               # evaluate fitness
+
+    regions = split_regions(W, B, n_islands)
+    cap = max(int((len(owned) + len(halo)) * 1.5) for owned, halo in regions)  # largest EP of an island
+    shared = SharedArrays({'W': W.shape, 'X': X.shape, 'Y': Y.shape,
+                           'priority': (n_pop,),
+                           'ref': (n_islands, n_obj), 'n_fe': (n_islands,), 'n_hits': (n_islands,), 'c_gen': (n_islands,),
+                           'EP_F': (n_islands, cap, n_obj), 'EP_X': (n_islands, cap, n_var),
+                           'EP_n': (n_islands,)})
+    try:
+        shared['W'][:] = W
+        shared['X'][:] = X
+        shared['Y'][:] = Y
+        shared['priority'][:] = priority_values(n_pop, params['priority_function'], params['ps_value'])
+
+        barrier = mp.Barrier(n_islands)
+        workers = [mp.Process(target=island_worker, args=(k, params, seed, regions, shared.spec, barrier))
+                   for k in range(n_islands)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if any(worker.exitcode != 0 for worker in workers):
+            raise RuntimeError('an island failed, see its traceback above')
+
+        return {'W': shared['W'].copy(), 'X': shared['X'].copy(), 'Y': shared['Y'].copy(),
+                'n_fe': int(n_pop + np.sum(shared['n_fe'])), 'c_gen': int(shared['c_gen'][0])}
+    finally:
+        shared.close()
+
+
+def main(argv=None):
+    ###################
+    # parse arguments #
+    ###################
+    parser = argparse.ArgumentParser()
+    parser.add_argument('params', type=argparse.FileType('r'))
+    parser.add_argument('seed', type=int)
+    args = parser.parse_args(argv)
+    params = yaml.safe_load(args.params)                                        # read config file
+    args.params.close()
+
+    result = run_islands(params, args.seed)
+
+    if params['save_data'] == 'True':
+        output = params['output']
+        make_output_dirs(output, params['prob_name'], args.seed)
+        save_final(output, params['prob_name'], args.seed, result['Y'], result['X'], result['n_fe'], result['c_gen'])
+    return result
+
+
+if __name__ == '__main__':
+    main()
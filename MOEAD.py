@@ -1,4 +1,3 @@
-import os
 import argparse
 import yaml
 import random
@@ -10,133 +9,159 @@ from WeightVector import das_dennis, determine_neighbor
 from Population import init_pop, eval_pop
 from ReferencePoint import init_ref_point, update_ref_point
 from Mutation import lf_mutation, poly_mutation, fix_bound
-from Decomposition import tchebycheff
-
-###################
-#  MOP to solve   #
-###################
-from pymoo.factory import get_problem
-# from platypus.problems import UF9
-###################
-# parse arguments #
-###################
-
-parser = argparse.ArgumentParser()
-parser.add_argument('params', type=argparse.FileType('r'))
-parser.add_argument('seed', type=int)
-args = parser.parse_args()
-
-##################
-# set parameters #
-##################
-
-params = yaml.safe_load(args.params)                                            # read config file
-
-random.seed(args.seed)                                                          # set the seed for reproducibility purposes
-np.random.seed(args.seed)                                                       # set the seed for reproducibility purposes
-
-output = params['output']                                                       # set output of record in this run
-
-n_obj = params['n_obj']                                                         # set number of objectives
-n_var = params['n_var']                                                         # set number of variables
-xl = params['xl']                                                               # set boundary of variables
-xu = params['xu']                                                               # set boundary of variables
-
-prob_name = params['prob_name']
-sld_n_part = params['sld_n_part']
-
-problem = set_problem(prob_name, n_var, n_obj, xu, xl)                          # set optimization problem                                               
-
-                                           # set number of partitions
-
-n_eval = params['n_eval']                                           # set maximum number of evaluation
-n_pop = int( comb(n_obj + sld_n_part - 1, n_obj - 1) )                  # compute population size
-
-T = params['T']                                                     # set neighbor size
-delta = params['delta']                                             # set probability to select parent from neighbor
-nr = params['nr']                                                   # set maximum update counts for one offspring
-
-alpha = params['alpha']                                             # set scaling factor of levy flight mutation
-beta = params['beta']                                               # set stability parameter of levy flight mutation
-etam = params['etam']                                               # set index parameter of polynomial mutation
-
-#################
-# start program #
-#################
-
-os.makedirs(f'./{output}', exist_ok=True)                           # create a folder to include running results
-os.makedirs(f'./{output}/history/', exist_ok=True)
-os.makedirs(f'./{output}/history/{prob_name}_{args.seed}', exist_ok=True)
-os.makedirs(f'./{output}/final/', exist_ok=True)                                # create a folder to include final results
-
-W = das_dennis(sld_n_part, n_obj)                                   # generate a set of weight vectors
-B = determine_neighbor(W, T)                                        # determine neighbor
-X = init_pop(n_pop, n_var, xl, xu)                                  # initialize a population
-
-Y = eval_pop(X, problem, prob_name)                                 # evaluate fitness
-z = init_ref_point(Y)                                               # determine a reference point
-
-n_fe = n_pop
-
-# for c_gen in range(1, n_gen):                                       # start main loop
-c_gen = 1
-
-while n_fe < n_eval:
-    result = np.hstack([Y, X])                                                  # record objective values (Y) and decision variables (X)
-    np.savetxt(f'./{output}/history/{prob_name}_{args.seed}/{c_gen}_paretos.csv', result)   # record information (Y, X) about the current generation
-
-    info_gen = np.hstack([n_fe, c_gen])                                         # record number of function evaluations and current generation
-    np.savetxt(f'./{output}/history/{prob_name}_{args.seed}/{c_gen}_info_gen.csv', info_gen)# record information (n_fe and c_gen) about the current generation
-
-    
-    for i in np.random.permutation(n_pop):                          # traverse the population; randomly permuting solutions in the population set
-
-        n_fe += 1
-        xi, fi = X[i, :], Y[i, :]                                   # get current individual and its fitness value
-
-        if random.random() < delta:                                 # determine selection pool by probability
-            pool = B[i, :]                                          # neighbor as the pool
-        else:
-            pool = np.arange(n_pop)                                 # population as the pool
-
-        j = int(np.random.choice(pool))                                  # select a random individual from pool
-        xj, fj = X[j, :], Y[j, :]
-
-        xi_ = fix_bound( lf_mutation(xi, xj, alpha, beta), xl, xu ) # levy flight mutation
-        xi_ = fix_bound( poly_mutation(xi_, etam, xl, xu), xl, xu ) # polynomial mutation
-        
-        fi_ = problem(xi_)                                              # evaluate offspring (new solution)
-
-        z = update_ref_point(z, fi_)                                # update reference point
-
-
-        nc = 0                                                      # initialize the update counter
-        for k in np.random.permutation(len(pool)):                  # traverse the selection pool
-
-            fk = Y[k, :]                                            # get k-th individual fitness
-            wk = W[k, :]                                            # get k-th weight vector
-
-            if tchebycheff(fi_, wk, z) <= tchebycheff(fk, wk, z):   # compare tchebycheff cost of offspring and parent
-
-                X[k] = xi_                                          # update parent
-                Y[k] = fi_
-                nc += 1                                             # cumulate the counter
-
-
-            if nc >= nr: break                                      # break if counter arrive the upper limit
-            
-
-
-            # exit()
-
-    c_gen += 1
-    # input('next gen normal moea.d')
-info_gen = np.hstack([n_fe, c_gen])                                      # record information (n_fe and c_gen) about the current generation
-result = np.hstack([Y, X])                                          # record objective values and decision variables
-
-np.savetxt(f'./{output}/history/{prob_name}_{args.seed}/{c_gen}_info_gen.csv', info_gen)
-np.savetxt(f'./{output}/history/{prob_name}_{args.seed}/{c_gen}_paretos.csv', result)
-
-np.savetxt(f'./{output}/final/{prob_name}_{args.seed}_paretos.csv', result)
-np.savetxt(f'./{output}/final/{prob_name}_{args.seed}_info_gen.csv', info_gen)
-
+from UpdateMethods import replace_neighbors
+from Decomposition import aggregation
+from Output import make_output_dirs, open_history, save_final
+from Snapshot import SnapshotPolicy, run_with_snapshots
+from Indicators import IndicatorRecorder
+from Checkpoint import Checkpointer, checkpoint_path, load_checkpoint, restore_checkpoint
+
+
+class MOEAD:
+    """
+    MOEA/D with Levy flight and polynomial mutations and Tchebycheff decomposition
+
+    The state of the optimizer (X, Y, W, B, ref_point, n_fe, c_gen) lives in
+    the attributes of the object; see AMOEAD for the same interface.
+
+    parameter
+    ----------
+    params: dict
+      configuration of the run, as read from the YAML files in exp_scripts_moead
+    seed: int
+      seed of `random` and `np.random`; None keeps the current RNG states
+    X, Y: 2D-Array
+      optional population and its fitness values (e.g. of a checkpoint); Y is not evaluated again
+    """
+
+    def __init__(self, params, seed=None, X=None, Y=None):
+        self.params = dict(params)
+
+        if seed is not None:
+            random.seed(seed)                                                   # set the seed for reproducibility purposes
+            np.random.seed(seed)                                                # set the seed for reproducibility purposes
+        self.seed = seed
+
+        self.n_obj = params['n_obj']                                            # set number of objectives
+        self.n_var = params['n_var']                                            # set number of variables
+        self.xl = params['xl']                                                  # set boundary of variables
+        self.xu = params['xu']                                                  # set boundary of variables
+
+        self.prob_name = params['prob_name']
+        self.sld_n_part = params['sld_n_part']                                  # set number of partitions
+
+        self.problem = set_problem(self.prob_name, self.n_var, self.n_obj, self.xu, self.xl)   # set optimization problem
+
+        self.n_eval = params['n_eval']                                          # set maximum number of evaluation
+        self.n_pop = int( comb(self.n_obj + self.sld_n_part - 1, self.n_obj - 1) )   # compute population size
+
+        self.T = params['T']                                                    # set neighbor size
+        self.delta = params['delta']                                            # set probability to select parent from neighbor
+        self.nr = params['nr']                                                  # set maximum update counts for one offspring
+
+        self.alpha = params['alpha']                                            # set scaling factor of levy flight mutation
+        self.beta = params['beta']                                              # set stability parameter of levy flight mutation
+        self.etam = params['etam']                                              # set index parameter of polynomial mutation
+        self.aggregate = aggregation('wt')                                      # Tchebycheff, resolved once
+
+        self.W = das_dennis(self.sld_n_part, self.n_obj)                        # generate a set of weight vectors
+        self.B = determine_neighbor(self.W, self.T)                             # determine neighbor
+        self.X = init_pop(self.n_pop, self.n_var, self.xl, self.xu) if X is None else np.array(X, dtype=float)   # initialize a population
+
+        self.Y = eval_pop(self.X, self.problem, self.prob_name) if Y is None else np.array(Y, dtype=float)   # evaluate fitness
+        self.ref_point = init_ref_point(self.Y)                                 # determine a reference point
+
+        self.n_fe = self.n_pop
+        self.c_gen = 1
+        self.on_evaluation = None                                               # optional hook called with the optimizer after each offspring
+
+    def run(self, n_eval=None, callback=None):
+        """
+        Run generations until n_eval function evaluations are reached; callback is called at the start of every generation
+        """
+        n_eval = self.n_eval if n_eval is None else n_eval
+        while self.n_fe < n_eval:
+            if callback is not None:
+                callback(self)
+            self.step()
+        return self
+
+    def step(self):
+        """
+        Run one generation
+        """
+        X, Y = self.X, self.Y
+        for i in np.random.permutation(self.n_pop):                             # traverse the population; randomly permuting solutions in the population set
+
+            self.n_fe += 1
+            xi = X[i, :]                                                        # get current individual
+
+            if random.random() < self.delta:                                    # determine selection pool by probability
+                pool = self.B[i, :]                                             # neighbor as the pool
+            else:
+                pool = np.arange(self.n_pop)                                    # population as the pool
+
+            j = int(np.random.choice(pool))                                     # select a random individual from pool
+            xj = X[j, :]
+
+            xi_ = fix_bound( lf_mutation(xi, xj, self.alpha, self.beta), self.xl, self.xu ) # levy flight mutation
+            xi_ = fix_bound( poly_mutation(xi_, self.etam, self.xl, self.xu), self.xl, self.xu ) # polynomial mutation
+
+            fi_ = self.problem(xi_)                                             # evaluate offspring (new solution)
+
+            self.ref_point = update_ref_point(self.ref_point, fi_)              # update reference point
+
+            replace_neighbors(self.aggregate, xi_, fi_, np.random.permutation(len(pool)),
+                              X, Y, self.W, self.ref_point, self.nr)            # replace at most nr solutions of the selection pool (tchebycheff)
+            if self.on_evaluation is not None:
+                self.on_evaluation(self)
+
+        self.c_gen += 1
+
+
+def main(argv=None):
+    ###################
+    # parse arguments #
+    ###################
+    parser = argparse.ArgumentParser()
+    parser.add_argument('params', type=argparse.FileType('r'))
+    parser.add_argument('seed', type=int)
+    parser.add_argument('--resume', nargs='?', const='', metavar='CHECKPOINT',
+                        help='continue from a checkpoint (default: the checkpoint file of the run)')
+    args = parser.parse_args(argv)
+    params = yaml.safe_load(args.params)                                        # read config file
+    args.params.close()
+
+    checkpoint = None
+    checkpointing = int(params.get('checkpoint_every', 0)) > 0 or float(params.get('checkpoint_seconds', 0)) > 0
+    if args.resume is not None:                                                 # rebuild the optimizer from X, Y without evaluating
+        arrays, meta = load_checkpoint(args.resume or checkpoint_path(params, args.seed))
+        moead = MOEAD(params, None, X=arrays['X'], Y=arrays['Y'])
+    else:
+        moead = MOEAD(params, args.seed)
+
+    output = params['output']                                                   # set output of record in this run
+    folder = make_output_dirs(output, moead.prob_name, args.seed)
+    history = open_history(params, folder, moead.n_obj, moead.n_var,
+                           meta['history_offset'] if args.resume is not None else None, checkpointing)
+    policies = [SnapshotPolicy(params, history)]
+
+    if params.get('indicators', 'False') == 'True':                            # track HV and IGD in-process
+        moead.indicators = IndicatorRecorder(params, moead.n_obj, moead.n_var,
+                                             f'./{output}/final/{moead.prob_name}_{args.seed}_indicators.csv')
+        policies.append(SnapshotPolicy(params, moead.indicators, prefix='indicator'))
+
+    if args.resume is not None:
+        restore_checkpoint(moead, arrays, meta, policies)
+    if checkpointing:
+        checkpoint = Checkpointer(checkpoint_path(params, args.seed), params.get('checkpoint_every', 0),
+                                  params.get('checkpoint_seconds', 0), policies, history)
+
+    run_with_snapshots(moead, policies, checkpoint)
+
+    save_final(output, moead.prob_name, args.seed, moead.Y, moead.X, moead.n_fe, moead.c_gen)
+    return moead
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import numpy as np
 import math
+from functools import lru_cache, wraps
 
 def SCH(x):
     f1 = x[0] ** 2
@@ -31,9 +32,6 @@ def UF1(x):
             count2 += 1
             
     f1 = x[0] + 2.0 * sum1 / count1
-    print(x[0])
-    print(math.sqrt(x[0]))
-    print(2.0 * sum2 / count2)
     f2 = 1.0 - math.sqrt(x[0]) + 2.0 * sum2 / count2
 
     return np.array([f1, f2])
@@ -348,8 +346,8 @@ def UF10(x):
     sum2 = 0.0
     sum3 = 0.0
     
-    for j in range(3, self.nvars+1):
-        yj = x[j-1] - 2.0*x[1]*math.sin(2.0*math.pi*x[0] + j*math.pi/self.nvars)
+    for j in range(3, nvars+1):
+        yj = x[j-1] - 2.0*x[1]*math.sin(2.0*math.pi*x[0] + j*math.pi/nvars)
         hj = 4.0*yj**2 - math.cos(8.0*math.pi*yj) + 1.0
         
         if j % 3 == 1:
@@ -369,3 +367,163 @@ def UF10(x):
     return np.array([f1, f2, f3])
 
 
+###########################################################
+# population versions: X is a (n, n_var) matrix, returns  #
+# a (n, n_obj) matrix; a single 1D vector is also accepted #
+###########################################################
+
+@lru_cache(maxsize=None)
+def uf_index_masks(n_var, n_obj):
+    """
+    Index masks of the UF problems, computed once per number of variables
+
+    parameter
+    ----------
+    n_var: int
+      number of decision variables
+    n_obj: int
+      number of objectives (2 splits the indices by parity, 3 by mod 3)
+
+    return
+    ----------
+    tuple
+      the 1-based indices j of the distance variables and one boolean mask
+      per objective selecting the j that contribute to it
+    """
+    j = np.arange(n_obj, n_var + 1)
+    if n_obj == 2:
+        masks = (j % 2 == 1, j % 2 == 0)
+    else:
+        masks = (j % 3 == 1, j % 3 == 2, j % 3 == 0)
+    return j, masks
+
+def population_function(function):
+    """
+    Let a population function also evaluate a single 1D individual
+    """
+    @wraps(function)
+    def wrapper(X):
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            return function(X[None, :])[0]
+        return function(X)
+    return wrapper
+
+@population_function
+def UF1_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2) = uf_index_masks(n_var, 2)
+    x0 = X[:, :1]
+    Yj = X[:, 1:] - np.sin(6.0*np.pi*x0 + j*np.pi/n_var)
+    f1 = X[:, 0] + 2.0 * np.mean(Yj[:, J1]**2, axis=1)
+    f2 = 1.0 - np.sqrt(X[:, 0]) + 2.0 * np.mean(Yj[:, J2]**2, axis=1)
+    return np.column_stack([f1, f2])
+
+@population_function
+def UF2_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2) = uf_index_masks(n_var, 2)
+    x0 = X[:, :1]
+    amp = 0.3*x0*(x0 * np.cos(24.0*np.pi*x0 + 4.0*j*np.pi/n_var) + 2.0)
+    angle = 6.0*np.pi*x0 + j*np.pi/n_var
+    Yj = X[:, 1:] - np.where(J1, amp*np.cos(angle), amp*np.sin(angle))
+    f1 = X[:, 0] + 2.0 * np.mean(Yj[:, J1]**2, axis=1)
+    f2 = 1.0 - np.sqrt(X[:, 0]) + 2.0 * np.mean(Yj[:, J2]**2, axis=1)
+    return np.column_stack([f1, f2])
+
+@population_function
+def UF3_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2) = uf_index_masks(n_var, 2)
+    x0 = X[:, :1]
+    Yj = X[:, 1:] - np.power(x0, 0.5*(1.0 + 3.0*(j - 2.0) / (n_var - 2.0)))
+    Pj = np.cos(20.0*Yj*np.pi/np.sqrt(j))
+    f1 = X[:, 0] + 2.0 * (4.0*np.sum(Yj[:, J1]**2, axis=1) - 2.0*np.prod(Pj[:, J1], axis=1) + 2.0) / np.sum(J1)
+    f2 = 1.0 - np.sqrt(X[:, 0]) + 2.0 * (4.0*np.sum(Yj[:, J2]**2, axis=1) - 2.0*np.prod(Pj[:, J2], axis=1) + 2.0) / np.sum(J2)
+    return np.column_stack([f1, f2])
+
+@population_function
+def UF4_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2) = uf_index_masks(n_var, 2)
+    x0 = X[:, :1]
+    Yj = np.abs(X[:, 1:] - np.sin(6.0*np.pi*x0 + j*np.pi/n_var))
+    Hj = Yj / (1.0 + np.exp(2.0*Yj))
+    f1 = X[:, 0] + 2.0 * np.mean(Hj[:, J1], axis=1)
+    f2 = 1.0 - X[:, 0]**2 + 2.0 * np.mean(Hj[:, J2], axis=1)
+    return np.column_stack([f1, f2])
+
+@population_function
+def UF5_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2) = uf_index_masks(n_var, 2)
+    N = 10.0
+    E = 0.1
+    x0 = X[:, :1]
+    Yj = X[:, 1:] - np.sin(6.0*np.pi*x0 + j*np.pi/n_var)
+    Hj = 2.0*Yj**2 - np.cos(4.0*np.pi*Yj) + 1.0
+    h = (0.5/N + E) * np.abs(np.sin(2.0*N*np.pi*X[:, 0]))
+    f1 = X[:, 0] + h + 2.0 * np.mean(Hj[:, J1], axis=1)
+    f2 = 1.0 - X[:, 0] + h + 2.0 * np.mean(Hj[:, J2], axis=1)
+    return np.column_stack([f1, f2])
+
+@population_function
+def UF6_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2) = uf_index_masks(n_var, 2)
+    N = 2.0
+    E = 0.1
+    x0 = X[:, :1]
+    Yj = X[:, 1:] - np.sin(6.0*np.pi*x0 + j*np.pi/n_var)
+    Pj = np.cos(20.0*Yj*np.pi/np.sqrt(j))
+    h = np.maximum(2.0 * (0.5/N + E) * np.sin(2.0*N*np.pi*X[:, 0]), 0.0)
+    f1 = X[:, 0] + h + 2.0 * (4.0*np.sum(Yj[:, J1]**2, axis=1) - 2.0*np.prod(Pj[:, J1], axis=1) + 2.0) / np.sum(J1)
+    f2 = 1.0 - X[:, 0] + h + 2.0 * (4.0*np.sum(Yj[:, J2]**2, axis=1) - 2.0*np.prod(Pj[:, J2], axis=1) + 2.0) / np.sum(J2)
+    return np.column_stack([f1, f2])
+
+@population_function
+def UF7_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2) = uf_index_masks(n_var, 2)
+    x0 = X[:, :1]
+    Yj = X[:, 1:] - np.sin(6.0*np.pi*x0 + j*np.pi/n_var)
+    y0 = np.power(X[:, 0], 0.2)
+    f1 = y0 + 2.0 * np.mean(Yj[:, J1]**2, axis=1)
+    f2 = 1.0 - y0 + 2.0 * np.mean(Yj[:, J2]**2, axis=1)
+    return np.column_stack([f1, f2])
+
+@population_function
+def UF8_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2, J3) = uf_index_masks(n_var, 3)
+    x0, x1 = X[:, :1], X[:, 1:2]
+    Yj = X[:, 2:] - 2.0*x1*np.sin(2.0*np.pi*x0 + j*np.pi/n_var)
+    f1 = np.cos(0.5*np.pi*X[:, 0]) * np.cos(0.5*np.pi*X[:, 1]) + 2.0 * np.mean(Yj[:, J1]**2, axis=1)
+    f2 = np.cos(0.5*np.pi*X[:, 0]) * np.sin(0.5*np.pi*X[:, 1]) + 2.0 * np.mean(Yj[:, J2]**2, axis=1)
+    f3 = np.sin(0.5*np.pi*X[:, 0]) + 2.0 * np.mean(Yj[:, J3]**2, axis=1)
+    return np.column_stack([f1, f2, f3])
+
+@population_function
+def UF9_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2, J3) = uf_index_masks(n_var, 3)
+    E = 0.1
+    x0, x1 = X[:, :1], X[:, 1:2]
+    Yj = X[:, 2:] - 2.0*x1*np.sin(2.0*np.pi*x0 + j*np.pi/n_var)
+    y = np.maximum((1.0 + E) * (1.0 - 4.0*(2.0*X[:, 0] - 1.0)**2), 0.0)
+    f1 = 0.5*(y + 2.0*X[:, 0])*X[:, 1] + 2.0 * np.mean(Yj[:, J1]**2, axis=1)
+    f2 = 0.5*(y - 2.0*X[:, 0] + 2.0)*X[:, 1] + 2.0 * np.mean(Yj[:, J2]**2, axis=1)
+    f3 = 1.0 - X[:, 1] + 2.0 * np.mean(Yj[:, J3]**2, axis=1)
+    return np.column_stack([f1, f2, f3])
+
+@population_function
+def UF10_pop(X):
+    n_var = X.shape[1]
+    j, (J1, J2, J3) = uf_index_masks(n_var, 3)
+    x0, x1 = X[:, :1], X[:, 1:2]
+    Yj = X[:, 2:] - 2.0*x1*np.sin(2.0*np.pi*x0 + j*np.pi/n_var)
+    Hj = 4.0*Yj**2 - np.cos(8.0*np.pi*Yj) + 1.0
+    f1 = np.cos(0.5*np.pi*X[:, 0]) * np.cos(0.5*np.pi*X[:, 1]) + 2.0 * np.mean(Hj[:, J1], axis=1)
+    f2 = np.cos(0.5*np.pi*X[:, 0]) * np.sin(0.5*np.pi*X[:, 1]) + 2.0 * np.mean(Hj[:, J2], axis=1)
+    f3 = np.sin(0.5*np.pi*X[:, 0]) + 2.0 * np.mean(Hj[:, J3], axis=1)
+    return np.column_stack([f1, f2, f3])
@@ -1,6 +1,7 @@
 import random
 import numpy as np
 from math import gamma as G
+from functools import lru_cache
 
 def perform_mutation(mutation_name, xi_, xj, X, params):
     
@@ -43,7 +44,7 @@ def poly_mutation(x, eta_m, xl, xu):
       an offspring
     """
     n_var = len(x)
-    is_mutated = np.random.choice([0, 1], n_var, p=[1 - 1 / n_var, 1 / n_var])
+    is_mutated = np.random.random_sample(n_var) >= poly_threshold(n_var)       # same draws and result as np.random.choice([0, 1], n_var, p=[1 - 1 / n_var, 1 / n_var])
     
     mu = random.random() 
     if mu < 0.5:
@@ -93,21 +94,34 @@ def mantegna(alpha, beta, n_var):
     if beta < 0.3 or beta > 1.99:
         print("Error: Mantegna's algorithm requires a beta between 0.3 to 1.99.")
         return None
-    num = G(1 + beta) * np.sin(np.pi * beta / 2)
-    den = G( (1 + beta) / 2 ) * beta * 2 ** ( (beta - 1) / 2 )
-    sigma_u = (num / den) ** (1 / beta)
+    sigma_u = mantegna_sigma(beta)
     u = np.random.normal(0, sigma_u, n_var)
     v = np.random.normal(0, 1, n_var)
     l = alpha * u / ( np.abs(v) ** (1 / beta) )
     return l
 
+@lru_cache(maxsize=4096)
+def mantegna_sigma(beta):
+    """
+    Standard deviation sigma_u of Mantegna's algorithm; cached, as there are at most n_pop distinct betas at a time
+    """
+    num = G(1 + beta) * np.sin(np.pi * beta / 2)
+    den = G( (1 + beta) / 2 ) * beta * 2 ** ( (beta - 1) / 2 )
+    return (num / den) ** (1 / beta)
+
+@lru_cache(maxsize=None)
+def poly_threshold(n_var):
+    cdf = np.cumsum([1 - 1 / n_var, 1 / n_var])                                 # the normalized cdf np.random.choice builds
+    cdf /= cdf[-1]
+    return cdf[0]
+
 def gutowski(alpha, beta, n_var):
     if beta <= 0 or beta > 2:
         print("Error: Gutowski's algorithm requires a beta between 0 to 2.")
         return None
     u = np.random.uniform(0, 1, n_var)
     l = u ** (- 1 / beta) - 1
-    sgn = np.random.choice([1, -1], n_var)
+    sgn = 1 - 2 * np.random.randint(0, 2, n_var)                                 # same draws and result as np.random.choice([1, -1], n_var)
     l = alpha * sgn * l
     return l
 
@@ -137,4 +151,193 @@ def de_mutation(xi, X, n_pop, current_candidate, F = 0.5):
     exclusive_solutions = all_solutions[np.arange(len(all_solutions))!=(current_candidate-1)]
     idxs = np.random.permutation(exclusive_solutions)[0:2]
     x = xi + F*(X[idxs[0], :]-X[idxs[1], :])
-    return x
\ No newline at end of file
+    return x
+
+class RandomBlocks:
+    """
+    Rows of random variates drawn from a Generator a block at a time
+    """
+
+    def __init__(self, draw, block):
+        self.draw = draw                                                        # draw(n) returns n rows
+        self.block = block
+        self.rows = None
+        self.next = block
+
+    def take(self):
+        if self.next >= self.block:
+            self.rows = self.draw(self.block)
+            self.next = 0
+        row = self.rows[self.next]
+        self.next += 1
+        return row
+
+
+class MutationEngine:
+    """
+    The mutations of perform_mutation with their random numbers drawn in blocks
+
+    Instead of several small calls to np.random per offspring, the variates
+    of each mutation are drawn from a numpy.random.Generator in blocks of
+    `block` offspring (by default the population size, so about one draw
+    per generation and mutation) and each offspring takes the next row.
+    sigma_u of the Levy flights comes from the cached mantegna_sigma. The
+    mutations follow the same distributions as the functions above, but
+    the random stream is a different one, so runs are not identical to
+    the ones with perform_mutation.
+
+    parameter
+    ----------
+    n_var: int
+      number of decision variables
+    rng: numpy.random.Generator
+      source of the random numbers
+    block: int
+      number of offspring drawn at once
+    """
+
+    def __init__(self, n_var, rng, block):
+        self.n_var = n_var
+        self.rng = rng
+        self.normal = RandomBlocks(lambda n: rng.standard_normal((n, 2, n_var)), block)    # u and v of Mantegna's algorithm
+        self.uniform = RandomBlocks(lambda n: rng.random((n, 2, n_var)), block)          # u and signs of Gutowski's algorithm
+        self.poly = RandomBlocks(lambda n: rng.random((n, n_var + 1)), block)            # mutated variables and mu
+        self.de = RandomBlocks(lambda n: rng.random((n, 2)), block)                      # the two distinct individuals
+
+    def mutate(self, mutation_name, xi_, xj, X, params):
+        xl = params['xl']                                                       # set boundary of variables
+        xu = params['xu']                                                       # set boundary of variables
+
+        if mutation_name == 'levyflight_mutation':
+            xi_ = fix_bound( xi_ + self.levy(params['alpha'], params['beta']) * (xi_ - xj), xl, xu )   # levy flight mutation
+
+        elif mutation_name == 'polynomial_mutation':
+            eta_m = params['etam']
+            row = self.poly.take()
+            is_mutated = row[:-1] >= poly_threshold(self.n_var)
+            mu = row[-1]
+            if mu < 0.5:
+                sigmaq = (2 * mu) ** ( 1 / (eta_m + 1) ) - 1
+            else:
+                sigmaq = 1 - ( 2 * (1 - mu) ) ** ( 1 / (eta_m + 1) )
+            xi_ = fix_bound( xi_ + is_mutated * sigmaq * (xu - xl), xl, xu )   # polynomial mutation
+
+        elif mutation_name == 'de_mutation':
+            F = params['beta']
+            if F <= 0 or F > 1:
+                print("Error: Differential Evolution algorithm requires a F between 0 to 1.")
+                return None
+            n_pop = params['n_pop']
+            excluded = params['i'] - 1                                          # as in de_mutation, which excludes nothing for i = 0
+            m = n_pop if excluded < 0 else n_pop - 1                            # number of candidates
+            u = self.de.take()
+            a = int(u[0] * m)                                                   # two distinct positions among the candidates
+            b = int(u[1] * (m - 1))
+            b += b >= a
+            if excluded >= 0:
+                a += a >= excluded
+                b += b >= excluded
+            xi_ = fix_bound( xi_ + F * (X[a, :] - X[b, :]), xl, xu )            # differential evolution mutation
+
+        return xi_
+
+    def levy(self, alpha, beta):
+        if beta < 0 or beta > 1.99:
+            print("Error: Stable distribution requires a beta between 0.3 to 1.99.")
+            return None
+        elif beta < 0.3:                                                        # Gutowski's algorithm
+            u, s = self.uniform.take()
+            return alpha * np.where(s < 0.5, 1, -1) * (u ** (- 1 / beta) - 1)
+        u, v = self.normal.take()                                               # Mantegna's algorithm
+        return alpha * mantegna_sigma(beta) * u / ( np.abs(v) ** (1 / beta) )
+
+
+def de_mutation_pop(X_off, X, I, J, beta, params, rng):
+    """
+    Differential evolution mutation of a whole offspring matrix
+
+    Row r gets F = beta[r] times the difference of two distinct individuals
+    of X, drawn as de_mutation does (excluding I[r] - 1, nothing for I[r] = 0).
+
+    parameter
+    ----------
+    X_off: 2D-Array
+      current offspring, one row per selected subproblem
+    X: 2D-Array
+      population
+    I, J: 1D-Array
+      index of the subproblem and of the partner of each row
+    beta: 1D-Array
+      parameter of each row (the self-adaptive P of the subproblems)
+    params: dict
+      configuration of the run
+    rng: numpy.random.Generator
+      source of the random numbers
+
+    return
+    ----------
+    2D-Array
+      mutated offspring, inside the boundaries
+    """
+    if np.any(beta <= 0) or np.any(beta > 1):
+        raise ValueError("Differential Evolution algorithm requires a F between 0 to 1.")
+    n_pop = len(X)
+    excluded = I - 1
+    m = np.where(excluded < 0, n_pop, n_pop - 1)                                # number of candidates of each row
+    u = rng.random((len(I), 2))
+    a = (u[:, 0] * m).astype(int)                                               # two distinct positions among the candidates
+    b = (u[:, 1] * (m - 1)).astype(int)
+    b += b >= a
+    a += (excluded >= 0) & (a >= excluded)
+    b += (excluded >= 0) & (b >= excluded)
+    return fix_bound( X_off + beta[:, None] * (X[a] - X[b]), params['xl'], params['xu'] )
+
+def lf_mutation_pop(X_off, X, I, J, beta, params, rng):
+    """
+    Levy flight mutation of a whole offspring matrix, with the stability parameter beta[r] for row r
+    """
+    return fix_bound( X_off + levy_pop(params['alpha'], beta, X_off.shape[1], rng) * (X_off - X[J]), params['xl'], params['xu'] )
+
+def levy_pop(alpha, beta, n_var, rng):
+    if np.any(beta < 0) or np.any(beta > 1.99):
+        raise ValueError("Stable distribution requires a beta between 0.3 to 1.99.")
+    b = beta[:, None]
+    l = np.empty((len(beta), n_var))
+    gut = beta < 0.3                                                            # Gutowski's algorithm for the small betas
+    man = ~gut                                                                  # Mantegna's algorithm for the others
+    if np.any(man):
+        u = rng.standard_normal((int(np.sum(man)), n_var))
+        v = rng.standard_normal(u.shape)
+        values, inverse = np.unique(beta[man], return_inverse=True)
+        sigma_u = np.array([mantegna_sigma(float(value)) for value in values])[inverse][:, None]
+        l[man] = sigma_u * u / ( np.abs(v) ** (1 / b[man]) )
+    if np.any(gut):
+        g = rng.random((int(np.sum(gut)), n_var))
+        sgn = np.where(rng.random(g.shape) < 0.5, 1, -1)
+        l[gut] = sgn * (g ** (- 1 / b[gut]) - 1)
+    return alpha * l
+
+def poly_mutation_pop(X_off, X, I, J, beta, params, rng):
+    """
+    Polynomial mutation of a whole offspring matrix (one mu per row, each variable mutated with probability 1/n_var)
+    """
+    eta_m, xl, xu = params['etam'], params['xl'], params['xu']
+    k, n_var = X_off.shape
+    is_mutated = rng.random((k, n_var)) >= poly_threshold(n_var)
+    mu = rng.random(k)
+    sigmaq = np.where(mu < 0.5,
+                      (2 * mu) ** ( 1 / (eta_m + 1) ) - 1,
+                      1 - ( 2 * (1 - mu) ) ** ( 1 / (eta_m + 1) ))
+    return fix_bound( X_off + is_mutated * sigmaq[:, None] * (np.asarray(xu) - np.asarray(xl)), xl, xu )
+
+def mutation_pipeline(mutation_list):
+    """
+    Resolve the mutation names of the configuration once into the matrix operators, applied in order
+    """
+    operators = {'levyflight_mutation': lf_mutation_pop,
+                 'polynomial_mutation': poly_mutation_pop,
+                 'de_mutation': de_mutation_pop}
+    for name in mutation_list:
+        if name not in operators:
+            raise ValueError(f'unknown mutation {name}')
+    return [operators[name] for name in mutation_list]
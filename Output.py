@@ -0,0 +1,211 @@
+import os
+import queue
+import threading
+import numpy as np
+from HistoryStore import HistoryWriter, names_by_n_fe
+
+
+def make_output_dirs(output, prob_name, seed):
+    """
+    Create the folders of a run and return the folder of its history
+
+    parameter
+    ----------
+    output: str
+      root folder of the results of an experiment
+    prob_name: str
+      name of the problem
+    seed: int
+      seed of the run
+
+    return
+    ----------
+    str
+      folder where the history of the run is recorded
+    """
+    os.makedirs(f'./{output}', exist_ok=True)                                   # create a folder to include running results
+    os.makedirs(f'./{output}/history/', exist_ok=True)                          # create a folder to include running results
+    os.makedirs(f'./{output}/history/{prob_name}_{seed}', exist_ok=True)        # create a folder to include running results
+    os.makedirs(f'./{output}/final/', exist_ok=True)                            # create a folder to include final results
+    return f'./{output}/history/{prob_name}_{seed}'
+
+
+def save_generation(folder, Y, X, n_fe, c_gen, name=None):
+    """
+    Record (Y, X) and (n_fe, c_gen) of a generation in the history folder, in files named by name (default: c_gen)
+    """
+    name = c_gen if name is None else name
+    result = np.hstack([Y, X])                                                  # record objective values (Y) and decision variables (X)
+    np.savetxt(f'{folder}/{name}_paretos.csv', result)                          # record information (Y, X) about the current generation
+
+    info_gen = np.hstack([n_fe, c_gen])                                         # record number of function evaluations and current generation
+    np.savetxt(f'{folder}/{name}_info_gen.csv', info_gen)                       # record information (n_fe and c_gen) about the current generation
+
+
+def save_final(output, prob_name, seed, Y, X, n_fe, c_gen):
+    """
+    Record (Y, X) and (n_fe, c_gen) at the end of a run in the final folder
+    """
+    result = np.hstack([Y, X])                                                  # record objective values and decision variables
+    info_gen = np.hstack([n_fe, c_gen])                                         # record information (n_fe and c_gen) about the current generation
+
+    np.savetxt(f'./{output}/final/{prob_name}_{seed}_paretos.csv', result)
+    np.savetxt(f'./{output}/final/{prob_name}_{seed}_info_gen.csv', info_gen)
+
+
+class CSVHistory:
+    """
+    History recorder writing one pair of CSV files per generation (see save_generation)
+
+    parameter
+    ----------
+    folder: str
+      history folder of the run
+    durable: bool
+      fsync the files on flush (at each checkpoint) and close; otherwise the
+      files are only written, as save_generation does
+    by_n_fe: bool
+      name the files by n_fe instead of c_gen, for snapshot policies that
+      can record several snapshots in one generation
+    """
+
+    def __init__(self, folder, durable=False, by_n_fe=False):
+        self.folder = folder
+        self.durable = durable
+        self.by_n_fe = by_n_fe
+        self.written = []                                                       # names of the files written since the last flush
+
+    def append(self, Y, X, n_fe, c_gen):
+        name = n_fe if self.by_n_fe else c_gen
+        save_generation(self.folder, Y, X, n_fe, c_gen, name)
+        if self.durable:
+            self.written.append(name)
+
+    def flush(self):
+        for key in self.written:                                                # make the files written since the last flush durable
+            for name in (f'{key}_paretos.csv', f'{key}_info_gen.csv'):
+                fd = os.open(f'{self.folder}/{name}', os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        self.written = []
+
+    def close(self):
+        self.flush()
+
+
+class AsyncHistory:
+    """
+    Hand the generations to another recorder from a background writer thread
+
+    append() only copies (Y, X) into one of depth + 1 reusable buffers and
+    queues it; the writer thread does the formatting and disk writes. If the
+    writer falls behind, append() waits for a free buffer. close() waits for
+    the queued generations, closes the wrapped recorder (flush and fsync)
+    and raises any error of the writer thread.
+
+    parameter
+    ----------
+    recorder: object
+      recorder with append(Y, X, n_fe, c_gen) and close()
+    depth: int
+      maximum number of generations waiting to be written
+    """
+
+    def __init__(self, recorder, depth=2):
+        self.recorder = recorder
+        self.free = queue.Queue()                                               # buffers ready to be filled
+        for _ in range(depth + 1):
+            self.free.put(None)                                                 # allocated on first use, when the shapes are known
+        self.pending = queue.Queue(maxsize=depth)                               # buffers waiting for the writer
+        self.error = None
+        self.closed = False
+        self.thread = threading.Thread(target=self._write, daemon=True)
+        self.thread.start()
+
+    def append(self, Y, X, n_fe, c_gen):
+        self._raise()
+        buffer = self.free.get()
+        if buffer is None or buffer[0].shape != np.shape(Y) or buffer[1].shape != np.shape(X):
+            buffer = (np.empty(np.shape(Y)), np.empty(np.shape(X)))
+        np.copyto(buffer[0], Y)
+        np.copyto(buffer[1], X)
+        self.pending.put((buffer, n_fe, c_gen))
+
+    def flush(self):
+        """
+        Wait for the queued generations and flush the wrapped recorder
+        """
+        self.pending.join()
+        self._raise()
+        return self.recorder.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.thread.join()
+        self.recorder.close()
+        self._raise()
+
+    def _write(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                self.pending.task_done()
+                return
+            buffer, n_fe, c_gen = item
+            if self.error is None:
+                try:
+                    self.recorder.append(buffer[0], buffer[1], n_fe, c_gen)
+                except Exception as e:                                          # reported to the optimizer thread
+                    self.error = e
+            self.free.put(buffer)
+            self.pending.task_done()
+
+    def _raise(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+
+def open_history(params, folder, n_obj, n_var, offset=None, durable=False):
+    """
+    Open the history recorder selected by `history_format` in params
+
+    parameter
+    ----------
+    params: dict
+      configuration of the run; `history_format` is 'csv' (default) or 'binary'
+    folder: str
+      history folder of the run, as returned by make_output_dirs
+    n_obj, n_var: int
+      number of objectives and of decision variables
+    offset: int
+      when resuming a run, the size of the binary history at the checkpoint
+      (the CSV files of the generations recorded again are overwritten)
+    durable: bool
+      fsync the CSV files at each flush, for runs with checkpoints (with
+      async_history they are always fsynced on close, also after an error)
+
+    return
+    ----------
+    object
+      recorder with append(Y, X, n_fe, c_gen) and close(); 'csv' writes the
+      files of a generation under its c_gen or, with snapshot_policy
+      'checkpoints' or 'geometric', under its n_fe; 'binary' appends
+      every generation to the single file `{folder}.hist` (see HistoryStore),
+      and `async_history: 'True'` moves the writing to a background thread
+    """
+    asynchronous = params.get('async_history', 'False') == 'True'
+    history_format = params.get('history_format', 'csv')
+    if history_format == 'binary':
+        history = HistoryWriter(f'{folder}.hist', n_obj, n_var, offset)
+    else:
+        history = CSVHistory(folder, durable or asynchronous, names_by_n_fe(params))   # the async writer always fsyncs on close
+
+    if asynchronous:
+        history = AsyncHistory(history)
+    return history
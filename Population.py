@@ -21,7 +21,7 @@ def init_pop(n_pop, n_var, xl, xu):
     X = np.random.uniform(xl, xu, (n_pop, n_var))
     return X
 
-def eval_pop(X, problem, problem_name):
+def eval_pop(X, problem, problem_name, pool=None):
     """
     Evaluate a population with the given objectives
     parameter
@@ -29,7 +29,10 @@ def eval_pop(X, problem, problem_name):
     X: 2D-Array
       population matrix where each row is an individual
     problem: method
-      objective function which returns fitness values of a input individual
+      objective function which returns fitness values of a input individual;
+      DTLZ and UF problems take the whole population matrix at once
+    pool: EvaluatorPool
+      optional pool of evaluator processes used instead of problem
     
     return
     -----------
@@ -37,11 +40,15 @@ def eval_pop(X, problem, problem_name):
       fitness value matrix where each row is the fitness values of an individual
     """
     # F = []]
+    if pool is not None:
+        return pool.evaluate(X)                                                 # evaluated by the worker processes, in shared memory
+
     benchmark_name = ''.join(i for i in problem_name if not i.isdigit())
 
-    if (benchmark_name == "dtlz" or benchmark_name == "DTLZ"):
-        F = problem(X)
-    elif (benchmark_name == "uf" or benchmark_name == "UF"):
+    if (benchmark_name == "dtlz" or benchmark_name == "DTLZ" or
+            benchmark_name == "uf" or benchmark_name == "UF"):
+        F = problem(X)                                                          # evaluate all rows in one call
+    else:
         F = []
         for x in X:
             F.append(problem(x))
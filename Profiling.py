@@ -0,0 +1,144 @@
+import json
+from time import perf_counter_ns
+import numpy as np
+
+
+PHASES = ('selection', 'mutation', 'evaluation', 'update_EP', 'replacement', 'awa', 'sa')
+COUNTERS = ('offspring', 'replacements', 'EP_size', 'dominance_checks')
+
+
+class PhaseProfiler:
+    """
+    Time the phases of every generation of an AMOEAD and count its events
+
+    The profiler wraps methods of the optimizer instance (and of its EP,
+    problem and evaluator pool), so the class itself carries no profiling
+    code and a run without a profiler costs nothing. Each wrapped call is
+    timed with perf_counter_ns and charged to its phase exclusive of the
+    wrapped calls nested in it, so the phases of a generation add up to
+    the time of step():
+
+      selection    step() itself: permutation, priority values, choice of the mating pool and partner
+      mutation     mutate() and create_offspring_matrix()
+      evaluation   the problem (or, with eval_cache, the problem behind the cache), the
+                   evaluator pool, and the wait for asynchronous evaluations
+      update_EP    EP.add, as called by update_EP
+      replacement  apply_offspring() without EP: reference point and replace_neighbors
+      awa          adjust_weights(), i.e. weight_adjustment
+      sa           adapt_parameters(), i.e. evolve
+
+    and counts the offspring, the solutions they replaced, the size of EP
+    at the end of the generation and the dominance checks of EP, as counted
+    by EP.add itself (the members a new solution is compared with or, for 2
+    objectives, the binary-search steps). One row per generation is kept and
+    written on close.
+
+    parameter
+    ----------
+    moead: AMOEAD
+      optimizer to instrument
+    path: str
+      file written on close, CSV (columns c_gen, n_fe, total_ns, the phases in ns, the counters)
+      or JSON lines if it ends with .json; None keeps the rows in memory only
+    """
+
+    def __init__(self, moead, path=None):
+        self.moead = moead
+        self.path = path
+        self.rows = []
+        self.stack = []                                                         # time spent in nested calls, one entry per open call
+        self.times = dict.fromkeys(PHASES, 0)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+
+        moead.step = self.timed('selection', moead.step, self.end_generation)
+        moead.mutate = self.timed('mutation', moead.mutate)
+        moead.create_offspring_matrix = self.timed('mutation', moead.create_offspring_matrix)
+        moead.apply_offspring = self.timed('replacement', moead.apply_offspring, self.count_replacements)
+        moead.apply_completed = self.timed('evaluation', moead.apply_completed)
+        moead.adjust_weights = self.timed('awa', moead.adjust_weights)
+        moead.adapt_parameters = self.timed('sa', moead.adapt_parameters)
+        evaluated = moead if moead.cache is None else moead.cache               # the cache calls the problem for the misses only
+        evaluated.problem = self.timed('evaluation', evaluated.problem)
+        if moead.pool is not None:
+            moead.pool.evaluate = self.timed('evaluation', moead.pool.evaluate)
+        EP = moead.EP
+        EP.count_checks = True                                                  # counted inside the timed add
+        EP.add = self.timed('update_EP', EP.add, self.count_dominance_checks, self.start_dominance_checks)
+        self.checks = 0
+
+    def timed(self, phase, method, after=None, before=None):
+        """
+        Wrap method so that its exclusive time is charged to phase
+
+        after(result) and before(*args) are optional callbacks for the counters.
+        """
+        stack, times = self.stack, self.times
+
+        def wrapper(*args, **kwargs):
+            if before is not None:
+                before(*args)
+            stack.append(0)
+            start = perf_counter_ns()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                times[phase] += elapsed - stack.pop()
+                if stack:
+                    stack[-1] += elapsed                                        # not charged again to the enclosing call
+            if after is not None:
+                after(result)
+            return result
+        return wrapper
+
+    def count_replacements(self, replaced):
+        self.counts['offspring'] += 1
+        self.counts['replacements'] += len(replaced)
+
+    def start_dominance_checks(self, f, x):
+        self.checks = self.moead.EP.checks
+
+    def count_dominance_checks(self, inserted):
+        self.counts['dominance_checks'] += self.moead.EP.checks - self.checks
+
+    def end_generation(self, result):
+        moead = self.moead
+        self.counts['EP_size'] = len(moead.EP)
+        total = sum(self.times.values())
+        self.rows.append((moead.c_gen - 1, moead.n_fe, total)
+                         + tuple(self.times[phase] for phase in PHASES)
+                         + tuple(self.counts[counter] for counter in COUNTERS))
+        self.times.update(dict.fromkeys(PHASES, 0))
+        self.counts.update(dict.fromkeys(COUNTERS, 0))
+
+    @property
+    def columns(self):
+        return ('c_gen', 'n_fe', 'total_ns') + tuple(f'{phase}_ns' for phase in PHASES) + COUNTERS
+
+    def summary(self):
+        """
+        Share of the total time of each phase, and the mean number of replacements per offspring
+
+        return
+        ----------
+        str
+          one line per phase
+        """
+        rows = np.array(self.rows, dtype=float).reshape(-1, len(self.columns))
+        total = max(np.sum(rows[:, 2]), 1)
+        lines = [f'{phase:12s} {np.sum(rows[:, 3 + k]) / 1e9:10.3f} s {100 * np.sum(rows[:, 3 + k]) / total:6.1f} %'
+                 for k, phase in enumerate(PHASES)]
+        offspring = np.sum(rows[:, 3 + len(PHASES)])
+        lines.append(f'replacements per offspring {np.sum(rows[:, 4 + len(PHASES)]) / max(offspring, 1):.3f}')
+        return '\n'.join(lines)
+
+    def close(self):
+        if self.path is None:
+            return
+        if self.path.endswith('.json'):
+            with open(self.path, 'w') as f:
+                for row in self.rows:
+                    f.write(json.dumps(dict(zip(self.columns, row))) + '\n')
+        else:
+            np.savetxt(self.path, np.array(self.rows, dtype=np.int64).reshape(-1, len(self.columns)),
+                       fmt='%d', delimiter=',', header=','.join(self.columns), comments='')
@@ -0,0 +1,93 @@
+#################################
+# import functions and packages #
+#################################
+import os
+import sys
+import argparse
+import importlib
+import traceback
+import yaml
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def init_worker():
+    """
+    Import the heavy packages and the MOEA/D modules once per worker process
+
+    The problems (Factory.set_problem) and the weight vectors with their
+    neighbors (WeightVector.weights_and_neighbors) are also kept per
+    worker, so the runs of a worker after the first one of a config skip
+    their setup.
+    """
+    import numpy, scipy.spatial, sklearn.neighbors
+    import pymoo.factory
+    import Factory, WeightVector, Population, ReferencePoint, Mutation
+    import Decomposition, PriorityFunctions, AdaptiveStrategy
+    import AdaptiveWeightAdjustment, SelectMethods, UpdateMethods
+    import AMOEAD, MOEAD
+    Factory.memo = {}
+    WeightVector.memo = {}
+
+
+def final_files(config):
+    """
+    Files written at the end of a run, or None if the config does not save its results
+    """
+    with open(config) as f:
+        params = yaml.safe_load(f)
+    if params.get('save_data') != 'True':
+        return None
+    output = params['output']
+    prob_name = params['prob_name']
+    return lambda seed: [f'./{output}/final/{prob_name}_{seed}_paretos.csv',
+                         f'./{output}/final/{prob_name}_{seed}_info_gen.csv']
+
+
+def run_one(script, config, seed):
+    """
+    Run the optimizer in this (already warm) process, as `python3 <script> <config> <seed>` would
+    """
+    try:
+        module = importlib.import_module(os.path.splitext(os.path.basename(script))[0])
+        module.main([config, str(seed)])
+        return config, seed, None
+    except Exception:                                                           # a failed run must not stop the sweep
+        return config, seed, traceback.format_exc()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a set of configs over a range of seeds on a process pool')
+    parser.add_argument('configs', nargs='+', help='YAML config files, e.g. exp_scripts_adaptive/DTLZ*_adaptive.yml')
+    parser.add_argument('--seeds', type=int, nargs=2, default=[0, 10], metavar=('FIRST', 'LAST'),
+                        help='inclusive seed range (default: 0 10)')
+    parser.add_argument('--script', default='AMOEAD.py', help='optimizer module with a main(argv) (default: AMOEAD.py)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of processes (default: all cores)')
+    parser.add_argument('--force', action='store_true', help='also run (config, seed) pairs whose final files exist')
+    args = parser.parse_args()
+
+    jobs = []
+    for config in args.configs:
+        files = final_files(config)
+        for seed in range(args.seeds[0], args.seeds[1] + 1):
+            if not args.force and files is not None and all(os.path.exists(f) for f in files(seed)):
+                print(f'skip {config} {seed}: final files exist')
+                continue
+            jobs.append((config, seed))
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=min(args.workers, max(len(jobs), 1)), initializer=init_worker) as pool:
+        futures = [pool.submit(run_one, args.script, config, seed) for config, seed in jobs]
+        for future in as_completed(futures):
+            config, seed, error = future.result()
+            if error is None:
+                print(f'done {config} {seed}')
+            else:
+                failed += 1
+                print(f'FAILED {config} {seed}\n{error}', file=sys.stderr)
+
+    print(f'{len(jobs) - failed}/{len(jobs)} runs finished')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
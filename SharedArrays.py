@@ -0,0 +1,59 @@
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+
+class SharedArrays:
+    """
+    A named set of float64 arrays living in multiprocessing.shared_memory blocks
+
+    The process that creates them owns the blocks (and unlinks them);
+    other processes attach to them with SharedArrays.attach(spec), where
+    spec is the picklable description returned by the spec property.
+
+    parameter
+    ----------
+    shapes: dict
+      name -> shape of each array
+    """
+
+    def __init__(self, shapes, _names=None):
+        self.blocks = {}
+        self.arrays = {}
+        self.owner = _names is None
+        own_tracker = resource_tracker._resource_tracker._fd is None            # a forked process shares the tracker of its parent
+        for key, shape in shapes.items():
+            size = max(int(np.prod(shape)) * 8, 1)
+            if self.owner:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=_names[key])
+                if own_tracker:
+                    resource_tracker.unregister(block._name, 'shared_memory')  # the owner unlinks it, not the tracker of this process
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        if self.owner:
+            for array in self.arrays.values():
+                array[...] = 0
+
+    @classmethod
+    def attach(cls, spec):
+        return cls({key: shape for key, (name, shape) in spec.items()},
+                   {key: name for key, (name, shape) in spec.items()})
+
+    @property
+    def spec(self):
+        return {key: (self.blocks[key].name, self.arrays[key].shape) for key in self.arrays}
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self):
+        """
+        Detach from the blocks; the owner also frees them
+        """
+        self.arrays = {}
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.blocks = {}
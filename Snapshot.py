@@ -0,0 +1,111 @@
+import numpy as np
+
+
+class SnapshotPolicy:
+    """
+    Decide when the state of a run is handed to a recorder (its history, its indicators)
+
+    snapshot_policy in params selects one of (the keys start with `prefix`
+    instead of `snapshot` for other recorders, e.g. indicator_policy):
+      'generation'   every snapshot_every generations (default 1, the original behavior)
+      'checkpoints'  whenever n_fe reaches one of snapshot_checkpoints, or a
+                     multiple of snapshot_step if no list is given
+      'geometric'    whenever n_fe reaches n_pop * snapshot_ratio ** k
+
+    Checkpoints are checked after every evaluated offspring, so the snapshot
+    is taken as soon as n_fe reaches a checkpoint, also in the middle of a
+    generation. Checkpoints not above the initial n_fe are recorded once at
+    the start of the run. These two policies can record several snapshots
+    in the same generation, so open_history names their CSV files by n_fe,
+    and the final state is not recorded again if a snapshot was already
+    taken at its n_fe.
+
+    parameter
+    ----------
+    params: dict
+      configuration of the run
+    recorder: object
+      recorder with append(Y, X, n_fe, c_gen) and close()
+    prefix: str
+      prefix of the keys of params read by the policy
+    """
+
+    def __init__(self, params, recorder, prefix='snapshot'):
+        self.recorder = recorder
+        self.policy = params.get(f'{prefix}_policy', 'generation')
+        self.every = int(params.get(f'{prefix}_every', 1))
+        self.checkpoints = None
+        n_eval = params['n_eval']
+
+        if self.policy == 'checkpoints':
+            if f'{prefix}_checkpoints' in params:
+                checkpoints = params[f'{prefix}_checkpoints']
+            else:
+                step = params[f'{prefix}_step']
+                checkpoints = np.arange(0, n_eval + step, step)
+            self.checkpoints = np.unique(np.asarray(checkpoints, dtype=float))
+        elif self.policy == 'geometric':
+            self.ratio = float(params.get(f'{prefix}_ratio', 2.0))
+            if self.ratio <= 1:
+                raise ValueError(f'{prefix}_ratio must be larger than 1')
+        elif self.policy != 'generation':
+            raise ValueError(f'unknown {prefix}_policy {self.policy}')
+        self.next = 0                                                           # index of the next checkpoint to record
+        self.last_n_fe = None                                                   # n_fe of the last recorded snapshot
+
+    def generation(self, moead):
+        """
+        Callback run at the start of every generation
+        """
+        if self.policy == 'generation':
+            if (moead.c_gen - 1) % self.every == 0:
+                self.record(moead)
+            return
+
+        if self.checkpoints is None:                                            # geometric spacing starts at the initial population
+            k = int(np.ceil(np.log(max(moead.n_eval / moead.n_fe, 1)) / np.log(self.ratio)))
+            self.checkpoints = moead.n_fe * self.ratio ** np.arange(k + 1)
+        self.evaluation(moead)
+
+    def evaluation(self, moead):
+        """
+        Hook run after every evaluated offspring
+        """
+        if self.checkpoints is None or self.next >= len(self.checkpoints):
+            return
+        if moead.n_fe >= self.checkpoints[self.next]:
+            self.record(moead)
+            self.next = int(np.searchsorted(self.checkpoints, moead.n_fe, 'right'))   # skip every checkpoint already reached
+
+    def record(self, moead):
+        self.recorder.append(moead.Y, moead.X, moead.n_fe, moead.c_gen)
+        self.last_n_fe = moead.n_fe
+
+    def final(self, moead):
+        """
+        Record the final state of the run, unless an n_fe policy has already recorded this n_fe
+        """
+        if self.policy == 'generation' or self.last_n_fe != moead.n_fe:
+            self.record(moead)
+
+
+def run_with_snapshots(moead, policies, checkpoint=None):
+    """
+    Run an optimizer with a list of SnapshotPolicy, record its final state in each and close their recorders
+
+    checkpoint is an optional callable run with the optimizer at the start
+    of every generation, before the policies (see Checkpoint.Checkpointer).
+    """
+    if len(policies) == 0 and checkpoint is None:
+        return moead.run()
+
+    callbacks = ([] if checkpoint is None else [checkpoint]) + [policy.generation for policy in policies]
+    try:
+        moead.on_evaluation = lambda m: [policy.evaluation(m) for policy in policies]
+        moead.run(callback=lambda m: [callback(m) for callback in callbacks])
+        for policy in policies:
+            policy.final(moead)                                                 # final state of the run
+    finally:
+        for policy in policies:
+            policy.recorder.close()
+    return moead
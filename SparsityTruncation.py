@@ -0,0 +1,78 @@
+import numpy as np
+from scipy.spatial.distance import cdist
+
+
+def removal_order(F, n_objs, n_remove):
+    """
+    Order in which the greedy k-NN truncation removes points
+
+    The greedy procedure repeatedly removes the point with the lowest
+    sparsity level (product of the distances to its n_objs - 1 nearest
+    neighbors, see calc_SL) and recomputes the sparsity levels of the points
+    that are left. Here the distance matrix is built once and, after each
+    removal, only the points that had the removed one among their nearest
+    neighbors get their sparsity level recomputed. Exact ties go to the
+    first point, so the sequence can differ from refitting the neighbors
+    with sklearn after every removal when sparsity levels tie: sklearn's
+    brute-force distances (used for small sets) break such ties by rounding,
+    e.g. between two mutual nearest neighbors with 2 objectives. Without
+    ties both sequences are the same.
+
+    parameter
+    ----------
+    F: 2D-Array
+      a matrix where each row is a point (objective values)
+    n_objs: int
+      number of objectives, sets the number of neighbors in the sparsity level
+    n_remove: int
+      number of points to remove
+
+    return
+    ----------
+    1D-Array
+      indices (rows of F) of the removed points, in removal order
+    """
+    n = len(F)
+    n_remove = min(max(int(n_remove), 0), n)
+    order = np.empty(n_remove, dtype=int)
+    if n_remove == 0:
+        return order
+
+    D = cdist(F, F)                                                             # pairwise distances, computed once
+    np.fill_diagonal(D, np.inf)
+    alive = np.ones(n, dtype=bool)
+    SL = np.empty(n)
+    k = min(n_objs, n) - 1
+    NN = neighbors(D, np.arange(n), k, SL)                                      # nearest neighbors of every point
+
+    for count in range(n_remove):
+        candidates = np.flatnonzero(alive)
+        r = candidates[np.argmin(SL[candidates])]                              # most crowded point (first one on ties)
+        order[count] = r
+        alive[r] = False
+        D[:, r] = np.inf
+
+        k_new = min(n_objs, n - count - 1) - 1
+        if k_new != k:                                                          # fewer points than objectives left
+            k = k_new
+            NN = np.full((n, max(k, 0)), -1)
+            affected = np.flatnonzero(alive)
+        else:
+            affected = np.flatnonzero(alive & np.any(NN == r, axis=1))          # only these lost one of their neighbors
+        if len(affected) > 0 and k >= 0:
+            NN[affected] = neighbors(D, affected, k, SL)
+
+    return order
+
+
+def neighbors(D, rows, k, SL):
+    """
+    Find the k nearest neighbors of the given rows of D and store their sparsity levels in SL
+    """
+    if k <= 0:
+        SL[rows] = 1.0                                                          # empty product, as in calc_SL
+        return np.empty((len(rows), 0), dtype=int)
+    NN = np.argpartition(D[rows], k - 1, axis=1)[:, :k]
+    dist = np.sort(np.take_along_axis(D[rows], NN, axis=1), axis=1)            # ascending, as returned by kneighbors
+    SL[rows] = np.prod(dist, axis=1)
+    return NN
@@ -0,0 +1,234 @@
+#################################
+# import functions and packages #
+#################################
+import os
+import sys
+import csv
+import glob
+import time
+import queue
+import argparse
+import traceback
+import resource
+import multiprocessing as mp
+import yaml
+import numpy as np
+
+from AMOEAD import AMOEAD
+from MOEAD import MOEAD
+from Indicators import hypervolume, reference_front
+from ExternalPopulation import ExternalPopulation
+
+
+VARIANTS = ('adaptive', 'moead', 'no_sa', 'no_w')                             # exp_scripts_<variant>
+COLUMNS = ('variant', 'problem', 'n_pop', 'n_eval', 'runs', 'startup_s', 'evals_per_s',
+           'peak_rss_mb', 'time_to_target_s', 'reached', 'final_hv')
+
+
+def variant_config(variant, problem):
+    """
+    Config file of a problem in exp_scripts_<variant>, e.g. exp_scripts_no_w/DTLZ2_adaptive.yml
+    """
+    paths = glob.glob(os.path.join(f'exp_scripts_{variant}', f'{problem.upper()}_*.yml'))
+    if len(paths) != 1:
+        raise FileNotFoundError(f'no single config for {problem} in exp_scripts_{variant}')
+    return paths[0]
+
+
+def run_once(config, seed, n_eval, started, results, n_snapshots=100):
+    """
+    Run one optimizer in this (fresh) process and put its measurements (or the traceback of its failure) in results
+
+    The objective values of the population are copied, with the time since
+    the start of the main loop, at the first generation after each of
+    n_snapshots evenly spaced evaluation counts, so the memory they take
+    (counted in the peak RSS) does not grow with the number of generations.
+    Their hypervolume is computed after the run, so it does not slow down
+    the timed loop.
+    """
+    try:
+        results.put(timed_run(config, seed, n_eval, started, n_snapshots))
+    except Exception:
+        results.put({'error': traceback.format_exc()})
+
+
+def timed_run(config, seed, n_eval, started, n_snapshots=100):
+    with open(config) as f:
+        params = yaml.safe_load(f)
+    params['save_data'] = 'False'
+    if n_eval is not None:
+        params['n_eval'] = n_eval
+
+    optimizer = AMOEAD if 'decomp_method' in params else MOEAD                  # exp_scripts_moead has configs of both
+    moead = optimizer(params, seed)
+    ready = time.time()                                                         # interpreter, imports, weights, initial population
+
+    n_fe_start = moead.n_fe
+    checkpoints = np.linspace(n_fe_start, moead.n_eval, n_snapshots + 1)[1:]  # evaluation counts of the snapshots
+    snapshots = []
+    next_checkpoint = [0]
+
+    def snapshot(m):
+        k = next_checkpoint[0]
+        if k < len(checkpoints) and m.n_fe >= checkpoints[k]:
+            snapshots.append((time.perf_counter() - start, m.Y.copy()))
+            next_checkpoint[0] = int(np.searchsorted(checkpoints, m.n_fe, 'right'))   # skip every checkpoint already reached
+
+    start = time.perf_counter()
+    moead.run(callback=snapshot)
+    elapsed = time.perf_counter() - start
+    snapshots.append((elapsed, moead.Y.copy()))
+    if hasattr(moead, 'close'):
+        moead.close()
+
+    return {'startup_s': ready - started, 'evals_per_s': (moead.n_fe - n_fe_start) / elapsed,
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,   # KiB on Linux
+            'n_pop': moead.n_pop, 'n_eval': moead.n_fe,
+            'prob_name': params['prob_name'], 'n_var': params['n_var'], 'n_obj': params['n_obj'],
+            'times': [t for t, Y in snapshots], 'Y': [Y for t, Y in snapshots]}
+
+
+def reference_set(results):
+    """
+    Points that set the scale of the hypervolume of a problem: pymoo's front or, without one (UF), the non-dominated points of the final populations of all its runs
+
+    The dominated points (e.g. of runs that did not converge) are left out,
+    so they do not stretch the bounds used for the scaling.
+    """
+    R = reference_front(results[0]['prob_name'], results[0]['n_var'], results[0]['n_obj'])
+    if R is None:
+        R = non_dominated(np.vstack([result['Y'][-1] for result in results]))
+    return R
+
+
+def non_dominated(Y):
+    """
+    Non-dominated rows of Y (without duplicates), with the archive of the optimizer
+    """
+    EP = ExternalPopulation(Y.shape[1], 0, len(Y))
+    for y in Y:
+        EP.add(y, np.empty(0))
+    return EP.objectives.copy()
+
+
+def hv_curve(result, R, target):
+    """
+    Hypervolume of every snapshot of a run and the time it first reaches target times the hypervolume of R
+
+    The objectives are scaled with the bounds of R only, so the
+    hypervolumes of all the snapshots and runs of a problem are comparable;
+    the reference point is 1 in every objective.
+    """
+    lower, upper = np.min(R, axis=0), np.max(R, axis=0)
+    scale = lambda Y: (Y - lower) / (upper - lower + 1e-16)
+    ref_point = np.ones(R.shape[1])
+    goal = target * hypervolume(scale(R), ref_point)
+    hv = np.array([hypervolume(scale(Y), ref_point) for Y in result['Y']])
+    reached = np.flatnonzero(hv >= goal)
+    return hv, (result['times'][reached[0]] if len(reached) > 0 else np.nan)
+
+
+def measure(config, seed, n_eval, n_snapshots=100):
+    """
+    Run a config in a new spawned process, so the startup time and the peak RSS are those of a single run
+    """
+    context = mp.get_context('spawn')
+    results = context.Queue()
+    started = time.time()
+    process = context.Process(target=run_once, args=(config, seed, n_eval, started, results, n_snapshots))
+    process.start()
+    while True:
+        try:
+            result = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if not process.is_alive():                                          # killed, e.g. out of memory
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    result = {'error': f'the run died with exit code {process.exitcode}'}
+                break
+    process.join()
+    return result
+
+
+def summarize(variant, problem, runs):
+    """
+    One row of the report: medians over the seeds (time to target over the runs that reached it)
+
+    Failed runs only count in the runs column (finished/started).
+    """
+    finished = [run for run in runs if 'error' not in run]
+    if not finished:
+        return {**dict.fromkeys(COLUMNS, np.nan), 'variant': variant, 'problem': problem, 'runs': f'0/{len(runs)}', 'reached': '-'}
+    n_runs = len(runs)
+    runs = finished
+    times = [run['time_to_target_s'] for run in runs if not np.isnan(run['time_to_target_s'])]
+    return {'variant': variant, 'problem': problem, 'n_pop': runs[0]['n_pop'],
+            'n_eval': int(np.median([run['n_eval'] for run in runs])), 'runs': f'{len(runs)}/{n_runs}',
+            'startup_s': np.median([run['startup_s'] for run in runs]),
+            'evals_per_s': np.median([run['evals_per_s'] for run in runs]),
+            'peak_rss_mb': np.max([run['peak_rss_mb'] for run in runs]),
+            'time_to_target_s': np.median(times) if times else np.nan,
+            'reached': f'{len(times)}/{len(runs)}',
+            'final_hv': np.median([run['final_hv'] for run in runs])}
+
+
+def format_table(rows):
+    cells = [[f'{row[c]:.3f}' if isinstance(row[c], float) else str(row[c]) for c in COLUMNS] for row in rows]
+    widths = [max(len(c), *(len(r[k]) for r in cells)) for k, c in enumerate(COLUMNS)]
+    lines = ['  '.join(c.rjust(w) for c, w in zip(COLUMNS, widths))]
+    lines += ['  '.join(c.rjust(w) for c, w in zip(r, widths)) for r in cells]
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the throughput of full runs of the MOEA/D variants')
+    parser.add_argument('--problems', nargs='+', default=['DTLZ2', 'DTLZ4', 'UF3', 'UF8'],
+                        help='problems, as in the names of the configs (default: DTLZ2 DTLZ4 UF3 UF8)')
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS),
+                        help='exp_scripts_<variant> to run (default: all)')
+    parser.add_argument('--n_eval', type=int, default=20000, help='evaluation budget of every run (default: 20000)')
+    parser.add_argument('--seeds', type=int, nargs=2, default=[0, 2], metavar=('FIRST', 'LAST'),
+                        help='inclusive seed range (default: 0 2)')
+    parser.add_argument('--target', type=float, default=0.9,
+                        help='target hypervolume, as a fraction of that of the reference set (default: 0.9)')
+    parser.add_argument('--snapshots', type=int, default=100,
+                        help='populations kept per run for the time to target, evenly spaced in n_fe (default: 100)')
+    parser.add_argument('--output', help='CSV file to save the report in')
+    args = parser.parse_args(argv)
+
+    rows = []
+    for problem in args.problems:
+        runs = {}
+        for variant in args.variants:
+            config = variant_config(variant, problem)
+            runs[variant] = []
+            for seed in range(args.seeds[0], args.seeds[1] + 1):
+                run = measure(config, seed, args.n_eval, args.snapshots)
+                runs[variant].append(run)
+                if 'error' in run:
+                    print(f"{config} {seed}: FAILED\n{run['error']}", file=sys.stderr)
+                else:
+                    print(f"{config} {seed}: {run['evals_per_s']:.0f} evaluations/s", file=sys.stderr)
+
+        finished = [run for variant in runs for run in runs[variant] if 'error' not in run]
+        if finished:
+            R = reference_set(finished)
+            for run in finished:
+                hv, run['time_to_target_s'] = hv_curve(run, R, args.target)
+                run['final_hv'] = hv[-1]
+        for variant in args.variants:
+            rows.append(summarize(variant, problem, runs[variant]))
+
+    print(format_table(rows))
+    if args.output is not None:
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.DictWriter(f, COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import numpy as np
+from Decomposition import agg_values
 
 def update(update_name, tch_, tchk, nc, X, Y, I):
 
@@ -18,3 +19,45 @@ def restricted_update(tch_, tchk, nc, X, Y, I):
 	
 
 	return nc, X, Y, I
+
+
+def replace_neighbors(agg_function, xi_, yi_, candidates, X, Y, W, ref_point, nr):
+	"""
+	Replace at most nr candidates whose aggregation value is not better than the offspring's
+
+	The candidates are visited in the given order, exactly as the per-neighbor
+	loop does, but the aggregation values of the offspring and of all the
+	candidates are computed in one (len(candidates), n_obj) operation.
+
+	parameter
+	----------
+	agg_function: str or method
+	  name of the scalar aggregation function, or the function resolved by Decomposition.aggregation
+	xi_, yi_: 1D-Array
+	  decision variables and fitness values of the offspring
+	candidates: 1D-Array
+	  indices of the solutions to compare with, in visiting order
+	X, Y, W: 2D-Array
+	  population, its fitness values and the weight vectors; X and Y are updated in place
+	ref_point: reference point
+	nr: int
+	  maximum number of replacements
+
+	return
+	----------
+	1D-Array
+	  indices of the replaced solutions
+	"""
+	Wc = W[candidates]
+	if callable(agg_function):
+		value_i = agg_function(yi_, Wc, ref_point)                         # aggregation value of the offspring for each candidate weight
+		value_k = agg_function(Y[candidates], Wc, ref_point)               # aggregation value of each candidate
+	else:
+		value_i = agg_values(agg_function, yi_, Wc, ref_point)             # aggregation value of the offspring for each candidate weight
+		value_k = agg_values(agg_function, Y[candidates], Wc, ref_point)   # aggregation value of each candidate
+
+	replaced = candidates[np.flatnonzero(value_i <= value_k)[:nr]]         # first nr improvements in visiting order
+	X[replaced] = xi_                                                      # update parents
+	Y[replaced] = yi_
+
+	return replaced
@@ -1,6 +1,10 @@
+import os
 import numpy as np
 from scipy.spatial.distance import cdist
 
+WEIGHT_CACHE_VERSION = 2                                                        # bump when get_weights or the neighbors change (2: WS_transform for 4+ objectives)
+memo = None                                                                     # {key: (W, B)} of this process, set to {} by RunExperiments' workers
+
 def get_weights(decomp_method, params):
     
     if decomp_method == "sld":
@@ -32,10 +36,76 @@ def das_dennis(n_part, n_obj):
     if n_part == 0:
         return np.full((1, n_obj), 1 / n_obj)
     else:
-        ref_dirs = []
-        ref_dir = np.full(n_obj, np.nan)
-        das_dennis_recursion(ref_dirs, ref_dir, n_part, n_part, 0)
-        return np.concatenate(ref_dirs, axis=0)
+        return das_dennis_counts(n_part, n_obj) / n_part                        # same vectors, in the same order, as das_dennis_recursion
+
+def das_dennis_counts(n_part, n_obj):
+    """
+    All the ways to split n_part into n_obj non-negative parts, in the lexicographic order of das_dennis_recursion
+
+    Built one objective at a time: each partial row with r partitions left
+    is expanded into r + 1 rows taking 0..r of them.
+    """
+    counts = np.zeros((1, 0), dtype=int)
+    remaining = np.array([n_part])
+    for depth in range(n_obj - 1):
+        n_children = remaining + 1
+        parent = np.repeat(np.arange(len(counts)), n_children)
+        taken = np.arange(len(parent)) - np.repeat(np.cumsum(n_children) - n_children, n_children)
+        counts = np.column_stack([counts[parent], taken])
+        remaining = remaining[parent] - taken
+    return np.column_stack([counts, remaining])
+
+def weights_and_neighbors(decomp_method, params, T):
+    """
+    Weight vectors (get_weights) and their T neighbors (determine_neighbor), optionally cached on disk
+
+    When params has a `weight_cache` folder, W and B are saved there once
+    per (n_obj, sld_n_part, T, WS_transform), under the WEIGHT_CACHE_VERSION
+    of the code that computed them, and later runs memory-map them
+    (copy-on-write, so the run may still modify its arrays). When the
+    module's memo is a dict, W and B are also kept in it and each later call
+    of the process returns copies of them.
+
+    return
+    ----------
+    tuple
+      W (2D-Array) and B (2D-Array of indices)
+    """
+    if decomp_method != 'sld':
+        W = get_weights(decomp_method, params)
+        return W, neighbors(W, T, params)
+
+    key = f"v{WEIGHT_CACHE_VERSION}_sld_{params['n_obj']}_{params['sld_n_part']}_{T}_{params['WS_transform']}"
+    if params.get('neighbor_method', 'argsort') != 'argsort':
+        key += f"_{params['neighbor_method']}"
+    if memo is None:
+        return cached_weights_and_neighbors(decomp_method, params, T, key)
+    if key not in memo:
+        memo[key] = tuple(np.array(a) for a in cached_weights_and_neighbors(decomp_method, params, T, key))
+    W, B = memo[key]
+    return W.copy(), B.copy()                                                   # the run modifies its arrays
+
+def cached_weights_and_neighbors(decomp_method, params, T, key):
+    """
+    W and B of weights_and_neighbors, read from or saved to the weight_cache folder if params has one
+    """
+    folder = params.get('weight_cache')
+    if folder is None:
+        W = get_weights(decomp_method, params)
+        return W, neighbors(W, T, params)
+
+    path_W = os.path.join(folder, f'{key}_W.npy')
+    path_B = os.path.join(folder, f'{key}_B.npy')
+    if not (os.path.exists(path_W) and os.path.exists(path_B)):
+        W = get_weights(decomp_method, params)
+        B = neighbors(W, T, params)
+        os.makedirs(folder, exist_ok=True)
+        for path, array in ((path_W, W), (path_B, B)):
+            tmp = f'{path}.{os.getpid()}.tmp.npy'                               # other runs may be reading or writing the same key
+            np.save(tmp, array)
+            os.replace(tmp, path)
+        return W, B
+    return np.load(path_W, mmap_mode='c'), np.load(path_B, mmap_mode='c')
 
 def determine_neighbor(ref_dirs, n_neighbors):
     """
@@ -53,6 +123,144 @@ def determine_neighbor(ref_dirs, n_neighbors):
     # exit()
     return np.argsort(cdist(ref_dirs, ref_dirs), axis=1, kind='quicksort')[:, :n_neighbors]
 
+def nearest_neighbors(ref_dirs, n_neighbors, rows=None, chunk_size=2**22):
+    """
+    Determine the neighbors of some weight vectors without a full distance matrix or full sorts
+
+    The distances are computed for blocks of rows of about chunk_size
+    values, the n_neighbors nearest of each row are selected with a
+    partial sort (np.partition) and only they are sorted. Ties are broken by the smaller
+    index, so the result only depends on the weight vectors (argsort in
+    determine_neighbor may order equidistant vectors differently).
+
+    parameter
+    ----------
+    ref_dirs: 2D-Array
+      a matrix of weight vector where each row is a weight vector
+    n_neighbors: int
+      number of neighbors
+    rows: 1D-Array
+      indices of the vectors whose neighbors are computed; all by default
+
+    return
+    ----------
+    2D-Array
+      indices of the neighbors of each row, nearest first
+    """
+    n = len(ref_dirs)
+    rows = np.arange(n) if rows is None else np.asarray(rows, dtype=int)
+    T = min(n_neighbors, n)
+    B = np.empty((len(rows), T), dtype=int)
+    step = max(1, chunk_size // max(n, 1))
+    for start in range(0, len(rows), step):
+        D = cdist(ref_dirs[rows[start:start + step]], ref_dirs)
+        kth = np.partition(D, T - 1, axis=1)[:, T - 1]                          # distance of the T-th nearest
+        r, c = np.nonzero(D <= kth[:, None])                                    # candidates, by row and then index
+        d = D[r, c]
+        tied = d == kth[r]
+        n_tied = np.bincount(r, weights=tied, minlength=len(D)).astype(int)
+        n_closer = np.bincount(r, minlength=len(D)) - n_tied
+        tied_rank = np.cumsum(tied) - np.repeat(np.cumsum(n_tied) - n_tied, n_tied + n_closer)
+        keep = ~tied | (tied_rank <= T - n_closer[r])                           # ties at the T-th: smaller indices first
+        part = c[keep].reshape(-1, T)                                           # the T nearest, by index
+        d = d[keep].reshape(-1, T)
+        B[start:start + step] = np.take_along_axis(part, np.argsort(d, axis=1, kind='stable'), axis=1)   # by distance, then index
+    return B
+
+def update_neighbors(ref_dirs, B, removed, n_neighbors):
+    """
+    Neighbors after the weight adjustment, recomputing only the rows that may have changed
+
+    The vectors in `removed` were deleted from the old set (so the others
+    moved up) and the new ones appended at the end of ref_dirs. The rows
+    that lost a neighbor, the rows for which a new vector is not farther
+    than their last neighbor and the new rows are recomputed with
+    nearest_neighbors; the result is the same as nearest_neighbors on the
+    whole set.
+
+    parameter
+    ----------
+    ref_dirs: 2D-Array
+      the weight vectors after the adjustment
+    B: 2D-Array
+      neighbors of the old weight vectors, as given by nearest_neighbors
+    removed: 1D-Array
+      indices of the deleted vectors in the old set
+    n_neighbors: int
+      number of neighbors
+
+    return
+    ----------
+    2D-Array
+      indices of the neighbors of each weight vector, nearest first
+    """
+    n_old = len(B)
+    kept = np.delete(np.arange(n_old), removed)
+    new_index = np.full(n_old, -1)
+    new_index[kept] = np.arange(len(kept))                                      # position of each old vector in the new set
+    B_kept = new_index[B[kept]]
+
+    added = np.arange(len(kept), len(ref_dirs))
+    last = np.linalg.norm(ref_dirs[:len(kept)] - ref_dirs[B_kept[:, -1]], axis=1)   # distance to the last neighbor
+    closer = np.any(cdist(ref_dirs[:len(kept)], ref_dirs[added]) <= last[:, None], axis=1)
+    changed = np.flatnonzero(np.any(B_kept < 0, axis=1) | closer)
+
+    B_new = np.empty((len(ref_dirs), B.shape[1]), dtype=int)
+    B_new[:len(kept)] = B_kept
+    rows = np.concatenate([changed, added])
+    B_new[rows] = nearest_neighbors(ref_dirs, n_neighbors, rows)
+    return B_new
+
+def patch_neighbors(ref_dirs, B, slots, n_neighbors, params):
+    """
+    Neighbors after the vectors in some slots were replaced in place, recomputing only the rows that may have changed
+
+    These are the replaced rows, the rows that had one of them as a
+    neighbor and the rows for which a new vector is not farther than their
+    last neighbor. With neighbor_method 'partition' the result is the same
+    as nearest_neighbors on the whole set; with 'argsort' the other rows
+    keep their previous order of equidistant neighbors.
+
+    parameter
+    ----------
+    ref_dirs: 2D-Array
+      the weight vectors, with the new vectors in their slots
+    B: 2D-Array
+      neighbors before the replacement
+    slots: 1D-Array
+      indices of the replaced vectors
+    n_neighbors: int
+      number of neighbors
+    params: dict
+      configuration of the run (neighbor_method)
+
+    return
+    ----------
+    2D-Array
+      indices of the neighbors of each weight vector, nearest first
+    """
+    lost = np.any(np.isin(B, slots), axis=1)
+    last = np.linalg.norm(ref_dirs - ref_dirs[B[:, -1]], axis=1)               # distance to the last neighbor
+    closer = np.any(cdist(ref_dirs, ref_dirs[slots]) <= last[:, None], axis=1)
+    rows = np.flatnonzero(lost | closer)
+
+    B = np.array(B)
+    B[rows] = neighbors(ref_dirs, n_neighbors, params, rows)
+    return B
+
+def neighbors(ref_dirs, n_neighbors, params, rows=None):
+    """
+    Neighbors (of the given rows, all by default) with the method of neighbor_method in params: 'argsort' (determine_neighbor, default) or 'partition' (nearest_neighbors)
+    """
+    method = params.get('neighbor_method', 'argsort')
+    if method == 'argsort' and rows is None:
+        return determine_neighbor(ref_dirs, n_neighbors)
+    elif method == 'argsort':
+        return np.argsort(cdist(ref_dirs[rows], ref_dirs), axis=1, kind='quicksort')[:, :n_neighbors]   # rows of determine_neighbor
+    elif method == 'partition':
+        return nearest_neighbors(ref_dirs, n_neighbors, rows)
+    raise ValueError(f'unknown neighbor_method {method}')
+
 def determine_neighbor_new(ref_dirs, n_neighbors):
     """
     Determine neighbor based on the set of weight vectors
@@ -80,17 +288,38 @@ def das_dennis_recursion(ref_dirs, ref_dir, n_part, beta, depth):
             ref_dir[depth] = 1.0 * i / (1.0 * n_part)
             das_dennis_recursion(ref_dirs, np.copy(ref_dir), n_part, beta - i, depth + 1)
 
-def WS_transform(Vector,epsilon=10**9+7):
-    small = 1/epsilon
-    for i in range(len(Vector)):
-        if sum(np.array(Vector[i])==0)==1:
-            Vector[i] = [Vector[i][j]+small for j in range(len(Vector[i]))]
-        elif sum(np.array(Vector[i])==0)==2:
-            continue
-        for j in range(len(Vector[i])):
-            Vector[i][j] = 1/Vector[i][j]
-
-    for i in range(len(Vector)):
-        SUM = np.sum(Vector[i])
-        Vector[i] = Vector[i]/SUM
-    return Vector
\ No newline at end of file
+def WS_transform(Vector):
+    """
+    Transform weight vectors for the Tchebycheff function: each vector becomes its normalized element-wise inverse
+
+    Vectorized over the rows. A zero weight has an infinite inverse, so a
+    vector with zero weights becomes the limit of the transform, uniform
+    over its zero weights (a single zero gives the unit vector the
+    original 1/(1e9+7) offset converged to), except that vectors with
+    exactly two zero weights are kept as they are, as before. The rows of
+    Vector are replaced in place.
+
+    parameter
+    ----------
+    Vector: 2D-Array
+      a matrix where each row is a weight vector
+
+    return
+    ----------
+    2D-Array
+      the transformed weight vectors (Vector itself)
+    """
+    W = np.asarray(Vector, dtype=float)
+    is_zero = W == 0
+    n_zero = np.sum(is_zero, axis=1)
+
+    V = np.empty_like(W)
+    positive = n_zero == 0
+    V[positive] = 1 / W[positive]
+    V[positive] /= np.sum(V[positive], axis=1, keepdims=True)
+    limit = (n_zero > 0) & (n_zero != 2)
+    V[limit] = is_zero[limit] / n_zero[limit, None]                             # inverse dominated by the zero weights
+    V[n_zero == 2] = W[n_zero == 2]
+
+    Vector[:] = V
+    return Vector
@@ -1,27 +1 @@
-# for i in {0..10} ; do
-#     python3 AMOEAD.py exp_scripts_moead/DTLZ1_moead.yml ${i}
-# done
-
-for i in {0..10} ; do
-    python3 AMOEAD.py exp_scripts_moead/DTLZ2_moead.yml ${i}
-done
-
-for i in {0..10} ; do
-    python3 AMOEAD.py exp_scripts_moead/DTLZ3_moead.yml ${i}
-done
-
-for i in {0..10} ; do
-    python3 AMOEAD.py exp_scripts_moead/DTLZ4_moead.yml ${i}
-done
-
-# for i in {0..10} ; do
-#     python3 AMOEAD.py exp_scripts_moead/DTLZ5_moead.yml ${i}
-# done
-
-# for i in {0..10} ; do
-#     python3 AMOEAD.py exp_scripts_moead/DTLZ6_moead.yml ${i}
-# done
-
-# for i in {0..10} ; do
-#     python3 AMOEAD.py exp_scripts_moead/DTLZ7_moead.yml ${i}
-# done
+python3 RunExperiments.py exp_scripts_moead/DTLZ{2,3,4}_moead.yml --seeds 0 10
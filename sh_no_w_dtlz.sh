@@ -1,27 +1 @@
-for i in {0..0} ; do
-    python3 AMOEAD.py exp_scripts_no_w/DTLZ1_adaptive.yml ${i}
-done
-
-for i in {0..0} ; do
-    python3 AMOEAD.py exp_scripts_no_w/DTLZ2_adaptive.yml ${i}
-done
-
-for i in {0..0} ; do
-    python3 AMOEAD.py exp_scripts_no_w/DTLZ3_adaptive.yml ${i}
-done
-
-for i in {0..0} ; do
-    python3 AMOEAD.py exp_scripts_no_w/DTLZ4_adaptive.yml ${i}
-done
-
-for i in {0..0} ; do
-    python3 AMOEAD.py exp_scripts_no_w/DTLZ5_adaptive.yml ${i}
-done
-
-for i in {0..0} ; do
-   python3 AMOEAD.py exp_scripts_no_w/DTLZ6_adaptive.yml ${i}
-done
-
- for i in {0..0} ; do
-     python3 AMOEAD.py exp_scripts_no_w/DTLZ7_adaptive.yml ${i}
- done
+python3 RunExperiments.py exp_scripts_no_w/DTLZ{1..7}_adaptive.yml --seeds 0 0
@@ -0,0 +1,36 @@
+import os
+import numpy as np
+
+from HistoryStore import HistoryWriter, HistoryReader, export_csv
+
+
+def write_history(path, records, n_obj=2, n_var=3):
+    with HistoryWriter(path, n_obj, n_var) as writer:
+        for n_fe, c_gen in records:
+            writer.append(np.full((4, n_obj), n_fe), np.full((4, n_var), c_gen), n_fe, c_gen)
+
+
+def test_export_mid_generation_history_keeps_every_record(tmp_path):
+    records = [(100, 1), (104, 1), (108, 1), (112, 2), (116, 2), (120, 3)]  # several snapshots per generation
+    path = str(tmp_path / 'run.hist')
+    write_history(path, records)
+    assert len(HistoryReader(path)) == len(records)
+
+    folder = str(tmp_path / 'csv')
+    export_csv(path, folder)
+    assert len(os.listdir(folder)) == 2 * len(records)
+    for n_fe, c_gen in records:
+        assert np.array_equal(np.loadtxt(f'{folder}/{n_fe}_info_gen.csv'), [n_fe, c_gen])
+
+
+def test_export_one_record_per_generation_is_named_by_c_gen(tmp_path):
+    records = [(100, 1), (110, 2), (120, 3)]
+    path = str(tmp_path / 'run.hist')
+    write_history(path, records)
+
+    folder = str(tmp_path / 'csv')
+    export_csv(path, folder)
+    assert sorted(os.listdir(folder)) == sorted(f'{c_gen}_{kind}.csv' for _, c_gen in records
+                                                for kind in ('paretos', 'info_gen'))
+    export_csv(path, str(tmp_path / 'by_n_fe'), by_n_fe=True)              # as the CSV history of an n_fe policy
+    assert os.path.exists(tmp_path / 'by_n_fe' / '110_paretos.csv')